@@ -17,7 +17,7 @@ from typing import Dict, List, Optional
 import threading
 
 from src.config import Config
-from src.kucoin_api import KuCoinAPI
+from src.kucoin_api import KuCoinAPI, AsyncKuCoinAPI
 from src.technical_analysis import generate_trading_signal
 from src.telegram_bot import TelegramBot
 from src.signal_tracker import SignalTracker
@@ -26,12 +26,15 @@ from src.ai_optimizer import AIOptimizer  # AI Optimizer eklendi!
 from src.m5_confirmation import M5ConfirmationSystem  # M5 onay sistemi
 
 class TradingBot:
+    MAX_COINS_TO_ANALYZE = 50  # Her analizde taranan en yüksek hacimli coin sayısı
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.config = Config()
+        self.config = Config.instance()
         
         # Gerekli bileşenleri başlat
         self.kucoin_api = None
+        self.async_kucoin_api = None  # Async market verisi istemcisi (aiohttp)
         self.telegram_bot = None
         self.signal_tracker = None
         self.signal_validator = None
@@ -58,6 +61,7 @@ class TradingBot:
             
             # API ve bileşenleri başlat
             self.kucoin_api = KuCoinAPI(self.config)
+            self.async_kucoin_api = AsyncKuCoinAPI(self.config)
             # technical_analyzer artık function olarak kullanılıyor
             
             # AI Optimizer'ı başlat
@@ -73,7 +77,8 @@ class TradingBot:
             # Signal tracker'ı başlat
             self.signal_tracker = SignalTracker(
                 self.kucoin_api, 
-                self.telegram_bot
+                self.telegram_bot,
+                ticker_stream=self.async_kucoin_api
             )
             
             # Signal validator'ı başlat
@@ -212,8 +217,9 @@ class TradingBot:
                 
             print("🔄 Yüksek hacimli coinler alınıyor...")
             # Yüksek hacimli coinleri al
+            # Yalnızca taranacak ilk N coin seçilir (tam sıralama yok)
             high_volume_coins = self.kucoin_api.get_high_volume_coins(
-                self.config.MIN_VOLUME_USDT
+                self.config.MIN_VOLUME_USDT, top_k=self.MAX_COINS_TO_ANALYZE
             )
             
             if not high_volume_coins:
@@ -227,10 +233,13 @@ class TradingBot:
             # En iyi sinyalleri bul
             potential_signals = []
             coins_analyzed = 0
-            max_coins_to_analyze = min(50, len(high_volume_coins))  # 🚀 İLK 50 COİN HIZLI ANALİZ
+            max_coins_to_analyze = min(self.MAX_COINS_TO_ANALYZE, len(high_volume_coins))  # 🚀 İLK 50 COİN HIZLI ANALİZ
             
             print(f"🎯 İlk {max_coins_to_analyze} coin analiz ediliyor (5M+ hacim)...")
             
+            # Tüm M5 onayları aynı zaman penceresini ister (hizalı klines istekleri)
+            m5_window_end = int(time.time())
+            
             for coin in high_volume_coins[:max_coins_to_analyze]:  # 🚀 İLK 50 COİNİ TARA
                 try:
                     symbol = coin['symbol']
@@ -256,7 +265,7 @@ class TradingBot:
                         # 🚨 YENİ: M5 Onay Sistemi
                         print(f"       📊 M5'te 2 mum onay bekleniyor...")
                         m5_confirmation = await self.m5_confirmation.confirm_signal_on_m5(
-                            symbol, signal, self.kucoin_api
+                            symbol, signal, self.async_kucoin_api, current_time=m5_window_end
                         )
                         
                         if m5_confirmation['confirmed']:
@@ -305,7 +314,7 @@ class TradingBot:
                     continue
                     
             print(f"\n📋 Analiz özeti:")
-            print(f"   💹 Toplam coin (5M+ hacim): {len(high_volume_coins)}")
+            print(f"   💹 Seçilen coin (5M+ hacim, en yüksek {self.MAX_COINS_TO_ANALYZE}): {len(high_volume_coins)}")
             print(f"   🔍 Analiz edilen: {coins_analyzed}")
             print(f"   🎯 Potansiyel sinyal: {len(potential_signals)}")
             print(f"   💰 Minimum hacim: $5,000,000 USDT")
@@ -331,6 +340,10 @@ class TradingBot:
                     if self.signal_tracker.is_symbol_already_active(symbol, signal_type):
                         print(f"   ⚠️ {symbol} {signal_type} sinyali zaten aktif! GEÇİLİYOR...")
                         return  # Bu analiz döngüsünü sonlandır
+                        
+                    if self.signal_tracker.is_at_capacity():
+                        print(f"   ⚠️ Aktif sinyal sınırı dolu ({self.signal_tracker.max_active_signals})! GEÇİLİYOR...")
+                        return  # Takip edilemeyecek sinyal Telegram'a gönderilmez
                     
                     print(f"   ✅ Güven eşiği geçildi! Sinyal gönderiliyor...")
                     # Signal'e symbol ekle
@@ -530,6 +543,8 @@ class TradingBot:
         
         last_update_count = 0
         update_interval = 0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         
         while self.is_running:
             try:
@@ -555,13 +570,16 @@ class TradingBot:
                         last_update_count = active_count
                 
                 await self.signal_tracker.update_signal_prices()
-                await asyncio.sleep(30)  # 30 saniyede bir güncelle
+                # 30 saniyede bir güncelle - sabit aralık, tick süresi uykudan düşülür
+                deadline = self.signal_tracker.next_tick_deadline(deadline, loop.time())
+                await asyncio.sleep(deadline - loop.time())
                 update_interval += 1
                 
             except Exception as e:
                 print(f"❌ Sinyal takip hatası: {e}")
                 self.logger.error(f"Sinyal takip hatası: {e}")
                 await asyncio.sleep(60)
+                deadline = loop.time()
                 
     async def _telegram_polling_loop(self):
         """Telegram polling döngüsü"""
@@ -647,6 +665,11 @@ class TradingBot:
         self.is_running = False
         
         try:
+            # Kuyrukta bekleyen TP/SL bildirimlerini polling kapanmadan gönder
+            if self.signal_tracker:
+                await self.signal_tracker.flush_notifications()
+                await self.signal_tracker.stop_ticker_stream()
+                
             # Telegram bot'u durdur
             if self.telegram_bot:
                 await self.telegram_bot.stop_polling()
@@ -657,6 +680,12 @@ class TradingBot:
                 self.signal_tracker._save_signal_history()
                 
             # ai_optimizer._save_performance_data() kaldırıldı
+            
+            # HTTP oturumunu kapat
+            if self.kucoin_api:
+                self.kucoin_api.close()
+            if self.async_kucoin_api:
+                await self.async_kucoin_api.close()
                 
             self.logger.info("Bot başarıyla durduruldu")
             
@@ -3,23 +3,217 @@ AI-Powered Trading Signal Optimizer
 Başarısız sinyalleri analiz ederek bot parametrelerini optimize eder
 """
 
+import atexit
+import heapq
 import json
+import mmap
 import os
+import time
 import pandas as pd
 import numpy as np
+from bisect import bisect_right
+from collections import Counter, deque
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson yoksa standart json ile devam et
+    orjson = None
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """JSON'u UTF-8 bytes olarak üret - orjson varsa Rust encoder'ı kullan"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 class AIOptimizer:
+    # 🧱 Instance alanları sabit - __dict__ yerine slot erişimi (paylaşılan durum sınıf değişkenlerinde)
+    __slots__ = (
+        'logger', 'performance_file', 'legacy_performance_file', 'current_settings',
+        'optimization_history', 'optimization_history_data', 'performance_baseline',
+        'last_optimization_time', 'param_ranges', '_optimization_log_appends',
+        '_settings_dirty', '_param_snapshot', '_filter_fn',
+        # Temel parametreler
+        'min_confidence_threshold', 'max_signals_per_hour', 'risk_reward_min',
+        'adx_threshold', 'volume_multiplier',
+        # Gelişmiş parametreler (__init_advanced_params ile ilk kullanımda atanır)
+        'smc_entry_precision', 'smc_confirmation_min', 'smc_risk_reward_ratio',
+        'tp1_distance_multiplier', 'tp2_distance_multiplier', 'tp3_distance_multiplier',
+        'sl_atr_multiplier', 'sl_percentage_max', 'ob_strength_min', 'fvg_size_min',
+        'volume_threshold_multiplier', 'liquidity_sweep_tolerance'
+    )
+    
+    # 📦 Sinyal sonucu tamponu - signal_tracker her sonuç için yeni instance açtığından sınıf seviyesinde paylaşılır
+    FLUSH_BATCH_SIZE = 25
+    FLUSH_INTERVAL_SECONDS = 30
+    MAX_PERFORMANCE_RECORDS = 1000
+    MAX_OPTIMIZATION_HISTORY = 200  # Bellekte ve dosyada tutulan son optimizasyon sonucu sayısı
+    MIN_SIGNALS_FOR_BREAKDOWN = 3   # Bundan az başarısız sinyalde sembol/saat kırılımı hesaplanmaz
+    
+    # 📐 M5 skor aralıkları - iç sınırlar searchsorted ile aralık indeksine çevrilir
+    M5_SCORE_RANGE_EDGES = np.array([70, 80, 90])
+    M5_SCORE_RANGE_LABELS = ('60-70%', '70-80%', '80-90%', '90-100%')
+    
+    # 🚦 Optimizasyon önceliği: hata sayısı 5 / 10 / 20 eşiklerine göre kademelenir
+    PRIORITY_BINS = (5, 10, 20)
+    PRIORITY_LABELS = ('low', 'medium', 'high', 'critical')
+    
+    # 🔢 Performans DataFrame kolon tipleri - object dtype yerine hızlı NumPy yolları
+    PERF_DTYPES = {
+        'success': 'bool',
+        'confidence': 'float32',
+        'risk_reward_ratio': 'float32',
+        'adx_value': 'float32',
+        'profit_loss_percent': 'float32',
+        'm5_confirmation_score': 'float32',
+        'm5_candle_1_score': 'int8',
+        'm5_candle_2_score': 'int8'
+    }
+    _pending_results = deque()
+    _last_flush = time.monotonic()
+    _atexit_registered = False
+    
+    NIGHT_HOURS = np.array([22, 23, 0, 1, 2, 3, 4, 5], dtype=np.int8)
+    AI_APPROVED_REASON = "✅ AI onayı alındı"
+    
+    # 📏 Gelişmiş parametrelerin alt/üst sınırları (_step_param ile uygulanır)
+    ADVANCED_PARAM_BOUNDS = {
+        'smc_entry_precision': (0.5, 1.0),
+        'smc_confirmation_min': (60, 80),
+        'smc_risk_reward_ratio': (1.5, 2.5),
+        'tp1_distance_multiplier': (0.8, 1.5),
+        'tp2_distance_multiplier': (1.5, 3.0),
+        'tp3_distance_multiplier': (2.0, 4.0),
+        'sl_atr_multiplier': (1.0, 3.0),
+        'sl_percentage_max': (1.0, 5.0),
+        'ob_strength_min': (70, 90),
+        'fvg_size_min': (0.5, 1.0),
+        'volume_threshold_multiplier': (1.5, 3.0),
+        'liquidity_sweep_tolerance': (0.1, 0.2)
+    }
+    
+    # 🧮 Gelişmiş parametre optimizasyon kuralları
+    # steps: (neden, eşik veya karşılaştırılan neden, {parametre: adım}) - first_match ise ilk tutan adımda durulur
+    # fields: (parametre, rapor etiketi) - tek alanlı gruplar old_value/new_value olarak raporlanır
+    OPTIMIZATION_RULES = (
+        {   # 1. ENTRY PRECİSİON - erken girişte hassasiyeti artır, geç girişte azalt
+            'parameter': 'entry_precision',
+            'steps': (
+                ('early_entry', 'late_entry', {'smc_entry_precision': 0.1}),
+                ('late_entry', 'early_entry', {'smc_entry_precision': -0.1})
+            ),
+            'first_match': True,
+            'fields': (('smc_entry_precision', 'entry_precision'),),
+            'reason': "Early entries: {early_entry}, Late entries: {late_entry}"
+        },
+        {   # 2. TAKE PROFIT - TP'ler uzaksa yakınlaştır, yakınsa uzaklaştır
+            'parameter': 'take_profits',
+            'steps': (
+                ('tp_missed', 3, {'tp1_distance_multiplier': -0.1, 'tp2_distance_multiplier': -0.2,
+                                  'tp3_distance_multiplier': -0.3}),
+                ('tp_too_close', 3, {'tp1_distance_multiplier': 0.1, 'tp2_distance_multiplier': 0.2,
+                                     'tp3_distance_multiplier': 0.3})
+            ),
+            'first_match': True,
+            'fields': (('tp1_distance_multiplier', 'tp1'), ('tp2_distance_multiplier', 'tp2'),
+                       ('tp3_distance_multiplier', 'tp3')),
+            'reason': "TP missed: {tp_missed}, TP too close: {tp_too_close}"
+        },
+        {   # 3. STOP LOSS - SL sık vuruluyorsa genişlet, gereksiz dar ise daralt
+            'parameter': 'stop_loss',
+            'steps': (
+                ('stop_loss_hit', 5, {'sl_atr_multiplier': 0.2, 'sl_percentage_max': 0.3}),
+                ('sl_too_tight', 3, {'sl_atr_multiplier': -0.1, 'sl_percentage_max': -0.2})
+            ),
+            'first_match': True,
+            'fields': (('sl_atr_multiplier', 'atr_multiplier'), ('sl_percentage_max', 'max_percentage')),
+            'reason': "SL hit: {stop_loss_hit}, SL too tight: {sl_too_tight}"
+        },
+        {   # 4. SMC KONFİRMASYON - zayıf konfirmasyonlar çoksa eşikleri artır
+            'parameter': 'smc_confirmation',
+            'steps': (
+                ('weak_confirmation', 3, {'smc_confirmation_min': 5, 'smc_risk_reward_ratio': 0.1}),
+            ),
+            'first_match': True,
+            'fields': (('smc_confirmation_min', 'min_confirmation'), ('smc_risk_reward_ratio', 'risk_reward')),
+            'reason': "Weak confirmations: {weak_confirmation}"
+        },
+        {   # 5. ORDER BLOCK & FVG - iki koşul bağımsız uygulanır
+            'parameter': 'ob_fvg',
+            'steps': (
+                ('weak_order_block', 2, {'ob_strength_min': 5}),
+                ('small_fvg', 2, {'fvg_size_min': 0.1})
+            ),
+            'first_match': False,
+            'fields': (('ob_strength_min', 'ob_strength'), ('fvg_size_min', 'fvg_size')),
+            'reason': "Weak OB: {weak_order_block}, Small FVG: {small_fvg}"
+        },
+        {   # 6. VOLUME ANALİZ - düşük hacim çoksa eşiği artır
+            'parameter': 'volume_analysis',
+            'steps': (
+                ('low_volume', 4, {'volume_threshold_multiplier': 0.2}),
+            ),
+            'first_match': True,
+            'fields': (('volume_threshold_multiplier', 'volume_threshold'),),
+            'reason': "Low volume signals: {low_volume}"
+        },
+        {   # 7. LİKİDİTE SWEEP - yanlış sweep'ler çoksa toleransı azalt
+            'parameter': 'liquidity_sweep',
+            'steps': (
+                ('false_liquidity_sweep', 2, {'liquidity_sweep_tolerance': -0.05}),
+            ),
+            'first_match': True,
+            'fields': (('liquidity_sweep_tolerance', 'sweep_tolerance'),),
+            'reason': "False sweeps: {false_liquidity_sweep}"
+        }
+    )
+    
+    # 🔎 Alt optimizasyonların izlediği başarısızlık nedenleri
+    FAILURE_TOKENS = (
+        'early_entry', 'late_entry', 'tp_missed', 'tp_too_close', 'stop_loss_hit',
+        'sl_too_tight', 'weak_order_block', 'small_fvg', 'low_volume', 'false_liquidity_sweep'
+    )
+    _perf_records = None  # Son 1000 kayıt (deque) - ilk okumada dosyadan doldurulur
+    _file_record_count = 0
+    # Penceredeki başarılı sinyal sayısı ve kâr toplamı - kayıt girip çıktıkça O(1) güncellenir
+    _window_successes = 0
+    _window_profit = 0.0
+    
+    # 🛑 SL pattern logu - her SL'de yeni instance açıldığından sayaç sınıf seviyesinde
+    MAX_SL_PATTERNS = 500
+    SL_PATTERN_COMPACT_EVERY = 50
+    _sl_pattern_appends = 0
+    _history_appends = 0  # optimization_history.jsonl kırpma sayacı (MAX_OPTIMIZATION_HISTORY satır tutulur)
+    
+    # 🧠 Son performans analizi - (mtime, boyut, eşikler) değişmedikçe yeniden hesaplanmaz
+    _analysis_key = None
+    _analysis_cache = None
+    # Performans DataFrame'i - yalnızca dosya (mtime, boyut) değişince yeniden kurulur
+    _perf_df_key = None
+    _perf_df_cache = None
+    # M5 analizi yalnızca performans dosyasına bağlı - dosya değişmedikçe yeniden hesaplanmaz
+    _m5_analysis_key = None
+    _m5_analysis_cache = None
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.performance_file = "data/signal_performance.json"
-        self.optimization_history = "data/optimization_history.json"
+        self.performance_file = "data/signal_performance.jsonl"
+        self.legacy_performance_file = "data/signal_performance.json"
+        self.optimization_history = "data/optimization_history.jsonl"
         self.current_settings = "data/current_optimizer_settings.json"
         
         # 🚀 Performans metriklerini takip et
-        self.optimization_history_data = []
+        self.optimization_history_data = deque(maxlen=self.MAX_OPTIMIZATION_HISTORY)
+        self._optimization_log_appends = 0
         self.performance_baseline = None
         self.last_optimization_time = None
         
@@ -40,24 +234,56 @@ class AIOptimizer:
         self.risk_reward_min = 1.5
         self.adx_threshold = 25.0
         self.volume_multiplier = 1.0
+        self._settings_dirty = False
+        self._param_snapshot = None  # get_optimized_parameters önbelleği
         
         self.load_current_settings()
         
+        # Kapanışta tamponda kalan sonuçlar kaybolmasın
+        if not AIOptimizer._atexit_registered:
+            atexit.register(self._flush_pending_results)
+            AIOptimizer._atexit_registered = True
+        
     def load_current_settings(self):
         """Mevcut optimizer ayarlarını yükle"""
         try:
-            if os.path.exists(self.current_settings):
-                with open(self.current_settings, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
-                    self.min_confidence_threshold = settings.get('min_confidence_threshold', 70.0)
-                    self.max_signals_per_hour = settings.get('max_signals_per_hour', 12)
-                    self.risk_reward_min = settings.get('risk_reward_min', 1.5)
-                    self.adx_threshold = settings.get('adx_threshold', 25.0)
-                    self.volume_multiplier = settings.get('volume_multiplier', 1.0)
-                    
-                self.logger.info("🤖 AI Optimizer ayarları yüklendi")
+            with open(self.current_settings, 'rb') as f:
+                settings = _json_loads(f.read())
+                self.min_confidence_threshold = settings.get('min_confidence_threshold', 70.0)
+                self.max_signals_per_hour = settings.get('max_signals_per_hour', 12)
+                self.risk_reward_min = settings.get('risk_reward_min', 1.5)
+                self.adx_threshold = settings.get('adx_threshold', 25.0)
+                self.volume_multiplier = settings.get('volume_multiplier', 1.0)
+                
+            self.logger.info("🤖 AI Optimizer ayarları yüklendi")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             self.logger.error(f"Optimizer ayarları yüklenirken hata: {e}")
+        
+        self._rebuild_filter()
+    
+    def _rebuild_filter(self):
+        """Güncel eşikleri yerel değişken olarak yakalayan sinyal filtresini üret"""
+        min_confidence = self.min_confidence_threshold
+        risk_reward_min = self.risk_reward_min
+        approved = (True, self.AI_APPROVED_REASON)
+        
+        def signal_filter(signal: Dict) -> tuple[bool, str]:
+            # Onay yolu sabit tuple döner; mesaj yalnızca red durumunda formatlanır
+            get = signal.get
+            confidence = get('confidence', 0)
+            if confidence < min_confidence:
+                return False, f"Düşük confidence: {confidence}% < {min_confidence}%"
+            
+            risk_reward = get('risk_reward_ratio', 0)
+            if risk_reward < risk_reward_min:
+                return False, f"Düşük R/R: {risk_reward} < {risk_reward_min}"
+            
+            return approved
+        
+        self._filter_fn = signal_filter
+        self._param_snapshot = None
     
     def save_current_settings(self):
         """Mevcut ayarları kaydet"""
@@ -71,105 +297,292 @@ class AIOptimizer:
                 'last_updated': datetime.now().isoformat()
             }
             
-            with open(self.current_settings, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            self._write_settings_file(settings)
                 
         except Exception as e:
             self.logger.error(f"Optimizer ayarları kaydedilirken hata: {e}")
     
+    def _write_settings_file(self, settings: Dict):
+        """Ayar dosyasını geçici dosya + os.replace ile atomik yaz"""
+        tmp_file = self.current_settings + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(settings, indent=True))
+        os.replace(tmp_file, self.current_settings)
+        self._settings_dirty = False
+    
+    def _settings_snapshot(self) -> tuple:
+        """Kaydedilen temel parametrelerin karşılaştırma için anlık görüntüsü"""
+        return (self.min_confidence_threshold, self.max_signals_per_hour, self.risk_reward_min,
+                self.adx_threshold, self.volume_multiplier)
+    
+    def _save_settings_if_dirty(self):
+        """Parametreler değiştiyse ayarları tek seferde kaydet ve filtreyi yenile"""
+        if self._settings_dirty:
+            self.save_current_settings()
+            self._rebuild_filter()
+    
     def record_signal_result(self, signal: Dict, actual_result: Dict):
         """Sinyal sonucunu kaydet"""
         try:
-            # M5 confirmation skorunu al
-            m5_confirmation_score = 0
-            m5_candle_1_score = 0
-            m5_candle_2_score = 0
-            
-            if 'm5_confirmation' in signal:
-                m5_confirmation_score = signal['m5_confirmation'].get('confirmation_strength', 0)
-                if 'candle_analysis' in signal['m5_confirmation']:
-                    candle_analyses = signal['m5_confirmation']['candle_analysis']
-                    if len(candle_analyses) >= 2:
-                        m5_candle_1_score = candle_analyses[0].get('points', 0)
-                        m5_candle_2_score = candle_analyses[1].get('points', 0)
-            
-            # Sonuç verisi hazırla
-            result_data = {
-                'timestamp': datetime.now().isoformat(),
-                'symbol': signal.get('symbol', 'UNKNOWN'),
-                'signal_type': signal.get('signal', 'UNKNOWN'),
-                'confidence': signal.get('confidence', 0),
-                'entry_price': signal.get('entry_price', 0),
-                'take_profit_1': signal.get('take_profit_1', 0),
-                'take_profit_2': signal.get('take_profit_2', 0),
-                'take_profit_3': signal.get('take_profit_3', 0),
-                'stop_loss': signal.get('stop_loss', 0),
-                'risk_reward_ratio': signal.get('risk_reward_ratio', 0),
-                'strategy': signal.get('reason', 'UNKNOWN'),
-                'adx_value': signal.get('adx_value', 0),
-                'volume_score': signal.get('volume_score', 0),
-                
-                # 🚨 YENİ: M5 Confirmation skorları
-                'm5_confirmation_score': m5_confirmation_score,
-                'm5_candle_1_score': m5_candle_1_score,
-                'm5_candle_2_score': m5_candle_2_score,
+            result_data = self._build_result_record(signal, actual_result)
+            self._buffer_results([result_data])
                 
-                # Gerçek sonuçlar
-                'success': actual_result.get('success', False),
-                'profit_loss_percent': actual_result.get('profit_loss_percent', 0),
-                'hit_tp1': actual_result.get('hit_tp1', False),
-                'hit_tp2': actual_result.get('hit_tp2', False),
-                'hit_tp3': actual_result.get('hit_tp3', False),
-                'hit_sl': actual_result.get('hit_sl', False),
-                'duration_minutes': actual_result.get('duration_minutes', 0),
-                'market_condition': actual_result.get('market_condition', 'UNKNOWN')
-            }
+            self.logger.info(f"📊 Sinyal sonucu kaydedildi: {signal.get('symbol')} - {'✅' if actual_result.get('success') else '❌'} (M5: {result_data['m5_confirmation_score']:.0f}%)")
             
-            # Dosyaya kaydet
-            performance_data = []
-            if os.path.exists(self.performance_file):
-                with open(self.performance_file, 'r', encoding='utf-8') as f:
-                    performance_data = json.load(f)
+        except Exception as e:
+            self.logger.error(f"Sinyal sonucu kaydedilirken hata: {e}")
+    
+    def record_signal_results(self, signals: List[Dict], actual_results: List[Dict]):
+        """Birden fazla sinyal sonucunu tek seferde kaydet (tek tampon eklemesi, en fazla bir dosya yazımı)"""
+        try:
+            records = [self._build_result_record(signal, actual_result)
+                       for signal, actual_result in zip(signals, actual_results)]
+            if not records:
+                return
+            self._buffer_results(records)
             
-            performance_data.append(result_data)
+            successes = sum(1 for record in records if record['success'])
+            self.logger.info(f"📊 {len(records)} sinyal sonucu kaydedildi: ✅ {successes} / ❌ {len(records) - successes}")
             
-            # Son 1000 kaydı tut
-            if len(performance_data) > 1000:
-                performance_data = performance_data[-1000:]
+        except Exception as e:
+            self.logger.error(f"Sinyal sonuçları kaydedilirken hata: {e}")
+    
+    def _build_result_record(self, signal: Dict, actual_result: Dict) -> Dict:
+        """Sinyal ve gerçekleşen sonuçtan performans kaydı oluştur"""
+        # M5 confirmation skorunu al - iç içe sözlüğe bir kez in, geçici boş dict üretme
+        m5_confirmation_score = 0
+        m5_candle_1_score = 0
+        m5_candle_2_score = 0
+        
+        m5_confirmation = signal.get('m5_confirmation')
+        if m5_confirmation is not None:
+            m5_confirmation_score = m5_confirmation.get('confirmation_strength', 0)
+            candle_analyses = m5_confirmation.get('candle_analysis')
+            if candle_analyses is not None and len(candle_analyses) >= 2:
+                m5_candle_1_score = candle_analyses[0].get('points', 0)
+                m5_candle_2_score = candle_analyses[1].get('points', 0)
+        
+        # Sonuç verisi hazırla
+        get = signal.get
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'symbol': get('symbol', 'UNKNOWN'),
+            'signal_type': get('signal', 'UNKNOWN'),
+            'confidence': get('confidence', 0),
+            'entry_price': get('entry_price', 0),
+            'take_profit_1': get('take_profit_1', 0),
+            'take_profit_2': get('take_profit_2', 0),
+            'take_profit_3': get('take_profit_3', 0),
+            'stop_loss': get('stop_loss', 0),
+            'risk_reward_ratio': get('risk_reward_ratio', 0),
+            'strategy': get('reason', 'UNKNOWN'),
+            'adx_value': get('adx_value', 0),
+            'volume_score': get('volume_score', 0),
+            
+            # 🚨 YENİ: M5 Confirmation skorları
+            'm5_confirmation_score': m5_confirmation_score,
+            'm5_candle_1_score': m5_candle_1_score,
+            'm5_candle_2_score': m5_candle_2_score,
+            
+            # Gerçek sonuçlar
+            'success': actual_result.get('success', False),
+            'profit_loss_percent': actual_result.get('profit_loss_percent', 0),
+            'hit_tp1': actual_result.get('hit_tp1', False),
+            'hit_tp2': actual_result.get('hit_tp2', False),
+            'hit_tp3': actual_result.get('hit_tp3', False),
+            'hit_sl': actual_result.get('hit_sl', False),
+            'duration_minutes': actual_result.get('duration_minutes', 0),
+            'market_condition': actual_result.get('market_condition', 'UNKNOWN')
+        }
+    
+    def _buffer_results(self, records: List[Dict]):
+        """Kayıtları bellekteki pencereye ve tampona ekle - dosyaya toplu yazılır"""
+        window = AIOptimizer._perf_records
+        if window is not None:
+            for record in records:
+                if len(window) == window.maxlen:
+                    self._update_window_totals(window[0], -1)  # append ile düşecek en eski kayıt
+                window.append(record)
+                self._update_window_totals(record, 1)
+        pending = AIOptimizer._pending_results
+        pending.extend(records)
+        if (len(pending) >= self.FLUSH_BATCH_SIZE or
+                time.monotonic() - AIOptimizer._last_flush > self.FLUSH_INTERVAL_SECONDS):
+            self._flush_pending_results()
+    
+    def _flush_pending_results(self):
+        """Tampondaki sinyal sonuçlarını JSONL dosyasına tek seferde ekle"""
+        pending = AIOptimizer._pending_results
+        if not pending:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(self.performance_file), exist_ok=True)
+            
+            lines = []
+            try:
+                # 'x' modu dosya zaten varsa hata verir - ayrı exists() kontrolüne gerek yok
+                out = open(self.performance_file, 'xb')
+            except FileExistsError:
+                out = open(self.performance_file, 'ab')
+            else:
+                # Eski JSON dizisi formatından tek seferlik geçiş
+                try:
+                    with open(self.legacy_performance_file, 'rb') as f:
+                        lines = [_json_dumps(r) + b"\n" for r in _json_loads(f.read())]
+                except FileNotFoundError:
+                    pass
             
-            with open(self.performance_file, 'w', encoding='utf-8') as f:
-                json.dump(performance_data, f, indent=2, ensure_ascii=False)
-                
-            self.logger.info(f"📊 Sinyal sonucu kaydedildi: {signal.get('symbol')} - {'✅' if actual_result.get('success') else '❌'} (M5: {m5_confirmation_score:.0f}%)")
+            lines.extend(_json_dumps(r) + b"\n" for r in pending)
+            
+            with out:
+                out.writelines(lines)
+            
+            AIOptimizer._file_record_count += len(lines)
+            pending.clear()
+            AIOptimizer._last_flush = time.monotonic()
+            
+            # Dosya çok büyüdüyse bellekteki son 1000 kayıtla yeniden yaz
+            if (AIOptimizer._perf_records is not None and
+                    AIOptimizer._file_record_count > 2 * self.MAX_PERFORMANCE_RECORDS):
+                self._rewrite_performance_file(AIOptimizer._perf_records)
             
         except Exception as e:
-            self.logger.error(f"Sinyal sonucu kaydedilirken hata: {e}")
+            self.logger.error(f"Sinyal sonuçları yazılırken hata: {e}")
+    
+    def _rewrite_performance_file(self, records):
+        """Performans dosyasını verilen kayıtlarla baştan yaz"""
+        with open(self.performance_file, 'wb') as f:
+            f.writelines(_json_dumps(r) + b"\n" for r in records)
+        AIOptimizer._file_record_count = len(records)
+    
+    def _read_performance_file(self) -> Optional[List[Dict]]:
+        """Performans dosyasını oku (JSONL, yoksa eski JSON dizisi), dosya yoksa None"""
+        try:
+            with open(self.performance_file, 'rb') as f:
+                # Dosyayı tek bytes nesnesine kopyalamadan satır satır tara (boş dosya mmap edilemez)
+                if os.fstat(f.fileno()).st_size == 0:
+                    records = []
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        records = [_json_loads(line) for line in iter(mm.readline, b'') if line.strip()]
+        except FileNotFoundError:
+            try:
+                with open(self.legacy_performance_file, 'rb') as f:
+                    return _json_loads(f.read())[-self.MAX_PERFORMANCE_RECORDS:]
+            except FileNotFoundError:
+                return None
+        AIOptimizer._file_record_count = len(records)
+        
+        # Dosya çok büyüdüyse son 1000 kayda sıkıştır
+        if len(records) > 2 * self.MAX_PERFORMANCE_RECORDS:
+            records = records[-self.MAX_PERFORMANCE_RECORDS:]
+            self._rewrite_performance_file(records)
+        
+        return records[-self.MAX_PERFORMANCE_RECORDS:]
+    
+    @staticmethod
+    def _update_window_totals(record: Dict, sign: int):
+        """Pencere toplamlarına kaydı ekle (sign=1) veya çıkar (sign=-1)"""
+        AIOptimizer._window_successes += sign * bool(record.get('success', False))
+        AIOptimizer._window_profit += sign * record.get('profit_loss_percent', 0)
+    
+    def _ensure_window(self) -> Optional[deque]:
+        """Bekleyenleri yaz ve son 1000 kayıtlık pencereyi hazırla, dosya yoksa None"""
+        self._flush_pending_results()
+        
+        if AIOptimizer._perf_records is None:
+            records = self._read_performance_file()
+            if records is None:
+                return None
+            window = deque(records, maxlen=self.MAX_PERFORMANCE_RECORDS)
+            AIOptimizer._perf_records = window
+            AIOptimizer._window_successes = sum(bool(r.get('success', False)) for r in window)
+            AIOptimizer._window_profit = float(sum(r.get('profit_loss_percent', 0) for r in window))
+        
+        return AIOptimizer._perf_records
+    
+    def _load_performance_records(self) -> Optional[List[Dict]]:
+        """Performans kayıtlarını yükle (son 1000 kayıt), dosya yoksa None"""
+        window = self._ensure_window()
+        return None if window is None else list(window)
+    
+    def _load_perf_df(self):
+        """Performans DataFrame'ini ve strateji istatistiklerini (tek groupby) oluştur - salt okunur, paylaşılır"""
+        self._flush_pending_results()
+        data_key = self._perf_file_key()
+        if data_key is not None and data_key == AIOptimizer._perf_df_key:
+            return AIOptimizer._perf_df_cache
+        
+        data = self._load_performance_records()
+        if data is None:
+            return None, None
+        
+        df = pd.DataFrame(data)
+        if df.empty:
+            return df, None
+        
+        # Eski kayıtlarda olmayan kolonları atla, dönüştürülemeyenleri olduğu gibi bırak
+        df = df.astype({col: dtype for col, dtype in self.PERF_DTYPES.items() if col in df.columns}, errors='ignore')
+        df['strategy'] = df['strategy'].astype('category')
+        # Zaman damgaları datetime.now().isoformat() - sabit format, C hızlı yolu
+        df['hour'] = pd.to_datetime(df['timestamp'], format='ISO8601', cache=True).dt.hour
+        
+        # Dosya değişmedikçe (yeni flush yoksa) aynı DataFrame yeniden kullanılır
+        AIOptimizer._perf_df_key = data_key
+        AIOptimizer._perf_df_cache = (df, self._strategy_stats(df))
+        return AIOptimizer._perf_df_cache
+    
+    @staticmethod
+    def _strategy_stats(df: pd.DataFrame) -> pd.DataFrame:
+        """Strateji bazında başarı ortalaması ve sinyal sayısı (factorize + bincount)"""
+        codes, strategies = pd.factorize(df['strategy'].to_numpy())
+        known = codes >= 0
+        codes = codes[known]
+        success = df['success'].to_numpy(dtype=np.float64)[known]
+        
+        totals = np.bincount(codes, minlength=len(strategies))
+        hits = np.bincount(codes, weights=success, minlength=len(strategies))
+        return pd.DataFrame({'mean': hits / totals, 'size': totals}, index=strategies)
+    
+    def _perf_file_key(self):
+        """Performans dosyasının (mtime, boyut) anahtarı, dosya yoksa None"""
+        try:
+            stat = os.stat(self.performance_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _analysis_cache_key(self):
+        """Performans dosyası ve eşiklerden analiz cache anahtarı üret"""
+        file_key = self._perf_file_key()
+        if file_key is None:
+            return None
+        return file_key + (self.min_confidence_threshold, self.risk_reward_min)
     
     def analyze_performance(self) -> Dict:
         """Performans analizi yap"""
         try:
-            if not os.path.exists(self.performance_file):
+            self._flush_pending_results()
+            cache_key = self._analysis_cache_key()
+            if cache_key is not None and cache_key == AIOptimizer._analysis_key:
+                return AIOptimizer._analysis_cache
+            
+            # Yetersiz veride DataFrame hiç kurulmaz
+            window = self._ensure_window()
+            if window is None:
                 return {"analysis": "Henüz yeterli veri yok"}
             
-            with open(self.performance_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if len(data) < 10:
+            if len(window) < 10:
                 return {"analysis": "Henüz yeterli veri yok (min 10 sinyal gerekli)"}
             
-            df = pd.DataFrame(data)
-            
-            # Genel istatistikler
-            total_signals = len(df)
-            success_rate = (df['success'].sum() / total_signals) * 100
-            avg_profit = df['profit_loss_percent'].mean()
-            total_profit = df['profit_loss_percent'].sum()
+            df, strat_stats = self._load_perf_df()
             
-            # Strateji bazında analiz
-            strategy_performance = df.groupby('strategy').agg({
-                'success': ['count', 'sum', 'mean'],
-                'profit_loss_percent': ['mean', 'sum']
-            }).round(2)
+            # Genel istatistikler - pencere toplamlarından O(1)
+            total_signals = len(window)
+            success_rate = (AIOptimizer._window_successes / total_signals) * 100
+            total_profit = AIOptimizer._window_profit
+            avg_profit = total_profit / total_signals
             
             # Confidence seviyesi analizi
             high_conf_signals = df[df['confidence'] >= 80]
@@ -177,7 +590,6 @@ class AIOptimizer:
             low_conf_signals = df[df['confidence'] < 70]
             
             # Zaman analizi
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
             hourly_performance = df.groupby('hour')['success'].mean()
             best_hours = hourly_performance.nlargest(3)
             worst_hours = hourly_performance.nsmallest(3)
@@ -190,58 +602,81 @@ class AIOptimizer:
                 "high_confidence_success": round(high_conf_signals['success'].mean() * 100, 2) if len(high_conf_signals) > 0 else 0,
                 "medium_confidence_success": round(medium_conf_signals['success'].mean() * 100, 2) if len(medium_conf_signals) > 0 else 0,
                 "low_confidence_success": round(low_conf_signals['success'].mean() * 100, 2) if len(low_conf_signals) > 0 else 0,
-                "best_strategy": strategy_performance.loc[strategy_performance[('success', 'mean')].idxmax()].name if len(strategy_performance) > 0 else "Bilinmiyor",
-                "worst_strategy": strategy_performance.loc[strategy_performance[('success', 'mean')].idxmin()].name if len(strategy_performance) > 0 else "Bilinmiyor",
+                "best_strategy": strat_stats['mean'].idxmax() if len(strat_stats) > 0 else "Bilinmiyor",
+                "worst_strategy": strat_stats['mean'].idxmin() if len(strat_stats) > 0 else "Bilinmiyor",
                 "best_hours": best_hours.to_dict(),
                 "worst_hours": worst_hours.to_dict(),
-                "recommendation": self.generate_recommendations(df)
+                "recommendation": self.generate_recommendations(df, strat_stats)
             }
             
+            # Öneriler eşikleri değiştirmiş olabilir, anahtarı güncel durumla sakla
+            AIOptimizer._analysis_key = self._analysis_cache_key()
+            AIOptimizer._analysis_cache = analysis
+            
             return analysis
             
         except Exception as e:
             self.logger.error(f"Performans analizi hatası: {e}")
             return {"analysis": f"Analiz hatası: {e}"}
     
-    def generate_recommendations(self, df: pd.DataFrame) -> List[str]:
+    @staticmethod
+    def _masked_mean(values: np.ndarray, mask: np.ndarray) -> float:
+        """Maskelenen değerlerin ortalaması, eşleşme yoksa NaN (pandas .mean() ile aynı)"""
+        count = np.count_nonzero(mask)
+        return values[mask].sum() / count if count else np.nan
+    
+    def generate_recommendations(self, df: pd.DataFrame, strat_stats: Optional[pd.DataFrame] = None) -> List[str]:
         """AI tabanlı öneriler üret"""
         recommendations = []
         
         try:
+            settings_before = self._settings_snapshot()
+            
+            if strat_stats is None:
+                strat_stats = self._strategy_stats(df)
+            
             # Confidence threshold analizi
-            high_conf = df[df['confidence'] >= 80]['success'].mean()
-            med_conf = df[(df['confidence'] >= 70) & (df['confidence'] < 80)]['success'].mean()
+            # Eşik karşılaştırmaları için kolonları bir kez NumPy dizisine çek
+            success = df['success'].to_numpy(dtype=np.float64)
+            confidence = df['confidence'].to_numpy()
+            risk_reward = df['risk_reward_ratio'].to_numpy()
+            adx = df['adx_value'].to_numpy()
+            
+            high_conf = self._masked_mean(success, confidence >= 80)
+            med_conf = self._masked_mean(success, (confidence >= 70) & (confidence < 80))
             
             if high_conf > med_conf + 0.15:  # %15 daha başarılı
                 recommendations.append("🎯 Confidence threshold'u 80'e yükselt - yüksek güvenli sinyaller daha başarılı")
                 self.min_confidence_threshold = min(80.0, self.min_confidence_threshold + 2.0)
             
             # Risk/Reward analizi
-            high_rr = df[df['risk_reward_ratio'] >= 2.0]['success'].mean()
-            low_rr = df[df['risk_reward_ratio'] < 2.0]['success'].mean()
+            high_rr = self._masked_mean(success, risk_reward >= 2.0)
+            low_rr = self._masked_mean(success, risk_reward < 2.0)
             
             if high_rr > low_rr + 0.1:
                 recommendations.append("💎 Risk/Reward oranını minimum 2.0'a çıkar")
                 self.risk_reward_min = max(2.0, self.risk_reward_min + 0.1)
             
             # ADX analizi
-            high_adx = df[df['adx_value'] >= 30]['success'].mean()
-            low_adx = df[df['adx_value'] < 30]['success'].mean()
+            high_adx = self._masked_mean(success, adx >= 30)
+            low_adx = self._masked_mean(success, adx < 30)
             
             if high_adx > low_adx + 0.1:
                 recommendations.append("⚡ ADX threshold'u 30'a yükselt - güçlü trend gerekli")
                 self.adx_threshold = min(35.0, self.adx_threshold + 1.0)
             
             # Zaman analizi
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-            night_success = df[df['hour'].isin([22, 23, 0, 1, 2, 3, 4, 5])]['success'].mean()
-            day_success = df[~df['hour'].isin([22, 23, 0, 1, 2, 3, 4, 5])]['success'].mean()
+            if 'hour' not in df.columns:
+                df['hour'] = pd.to_datetime(df['timestamp'], format='ISO8601', cache=True).dt.hour
+            is_night = np.isin(df['hour'].to_numpy(), self.NIGHT_HOURS)
+            night_success = self._masked_mean(success, is_night)
+            day_success = self._masked_mean(success, ~is_night)
             
             if day_success > night_success + 0.15:
                 recommendations.append("🕐 Gece saatlerinde daha az sinyal ver (22:00-06:00)")
             
             # Strateji analizi
-            strategy_performance = df.groupby('strategy')['success'].mean()
+            strategy_performance = strat_stats['mean']
             if len(strategy_performance) > 1:
                 best_strategy = strategy_performance.idxmax()
                 worst_strategy = strategy_performance.idxmin()
@@ -250,7 +685,7 @@ class AIOptimizer:
                     recommendations.append(f"🎯 {best_strategy} stratejisine öncelik ver, {worst_strategy} stratejisini azalt")
             
             # Genel başarı oranı kontrolü
-            overall_success = df['success'].mean()
+            overall_success = success.mean()
             if overall_success < 0.6:  # %60'ın altında
                 recommendations.append("⚠️ Genel başarı oranı düşük - tüm parametreleri sıkılaştır")
                 self.min_confidence_threshold = min(85.0, self.min_confidence_threshold + 5.0)
@@ -259,8 +694,10 @@ class AIOptimizer:
                 recommendations.append("🚀 Başarı oranı yüksek - daha fazla sinyal verebiliriz")
                 self.max_signals_per_hour = min(20, self.max_signals_per_hour + 2)
             
-            # Ayarları kaydet
-            self.save_current_settings()
+            # Ayarları kaydet (yalnızca değiştiyse)
+            if self._settings_snapshot() != settings_before:
+                self._settings_dirty = True
+            self._save_settings_if_dirty()
             
             if not recommendations:
                 recommendations.append("✅ Mevcut parametreler optimal görünüyor")
@@ -274,20 +711,9 @@ class AIOptimizer:
     def should_send_signal(self, signal: Dict) -> tuple[bool, str]:
         """Sinyalin gönderilip gönderilmeyeceğini AI ile karar ver"""
         try:
-            # Temel filtreleme
-            confidence = signal.get('confidence', 0)
-            risk_reward = signal.get('risk_reward_ratio', 0)
-            
-            if confidence < self.min_confidence_threshold:
-                return False, f"Düşük confidence: {confidence}% < {self.min_confidence_threshold}%"
-            
-            if risk_reward < self.risk_reward_min:
-                return False, f"Düşük R/R: {risk_reward} < {self.risk_reward_min}"
-            
-            # Saatlik sinyal limitı kontrolü
-            # Bu kısım main.py'de yapılmalı
-            
-            return True, "✅ AI onayı alındı"
+            # Temel filtreleme - eşikler _rebuild_filter ile closure'a gömülü
+            # Saatlik sinyal limitı kontrolü main.py'de yapılıyor
+            return self._filter_fn(signal)
             
         except Exception as e:
             self.logger.error(f"Sinyal filtreleme hatası: {e}")
@@ -358,6 +784,7 @@ class AIOptimizer:
             if not result.get('hit_sl', False):
                 return
             
+            settings_before = self._settings_snapshot()
             stop_loss_reason = result.get('stop_loss_reason', 'Unknown')
             symbol = signal.get('symbol', 'UNKNOWN')
             strategy = signal.get('reason', 'UNKNOWN')
@@ -389,8 +816,10 @@ class AIOptimizer:
                 if result.get('duration_minutes', 0) < 15:  # Çok erken SL
                     self.logger.info(f"🤖 Momentum stratejisinde erken SL: {symbol} - Momentum filtreleri sıkılaştırılacak")
             
-            # Ayarları kaydet
-            self.save_current_settings()
+            # Ayarları kaydet (yalnızca değiştiyse)
+            if self._settings_snapshot() != settings_before:
+                self._settings_dirty = True
+            self._save_settings_if_dirty()
             
             # SL pattern log'u
             pattern_log = {
@@ -411,23 +840,20 @@ class AIOptimizer:
             self.logger.error(f"SL pattern analizi hatası: {e}")
     
     def _save_sl_pattern(self, pattern_log: Dict):
-        """SL pattern'ını dosyaya kaydet"""
+        """SL pattern'ını JSONL dosyasının sonuna ekle"""
         try:
-            sl_patterns_file = "data/sl_patterns.json"
-            patterns = []
-            
-            if os.path.exists(sl_patterns_file):
-                with open(sl_patterns_file, 'r', encoding='utf-8') as f:
-                    patterns = json.load(f)
-            
-            patterns.append(pattern_log)
-            
-            # Son 500 kaydı tut
-            if len(patterns) > 500:
-                patterns = patterns[-500:]
-            
-            with open(sl_patterns_file, 'w', encoding='utf-8') as f:
-                json.dump(patterns, f, indent=2, ensure_ascii=False)
+            sl_patterns_file = "data/sl_patterns.jsonl"
+            
+            with open(sl_patterns_file, 'ab') as f:
+                f.write(_json_dumps(pattern_log) + b"\n")
+            
+            # Son 500 kaydı tut - her 50 eklemede bir kırp
+            AIOptimizer._sl_pattern_appends += 1
+            if AIOptimizer._sl_pattern_appends % self.SL_PATTERN_COMPACT_EVERY == 0:
+                with open(sl_patterns_file, 'rb') as f:
+                    patterns = deque(f, maxlen=self.MAX_SL_PATTERNS)
+                with open(sl_patterns_file, 'wb') as f:
+                    f.writelines(patterns)
                 
         except Exception as e:
             self.logger.error(f"SL pattern kaydetme hatası: {e}")
@@ -435,78 +861,83 @@ class AIOptimizer:
     def analyze_m5_confirmation_performance(self) -> Dict:
         """M5 confirmation sisteminin performansını analiz et"""
         try:
-            if not os.path.exists(self.performance_file):
-                return {'status': 'error', 'message': 'Henüz veri yok'}
+            self._flush_pending_results()
+            cache_key = self._perf_file_key()
+            if cache_key is not None and cache_key == AIOptimizer._m5_analysis_key:
+                return AIOptimizer._m5_analysis_cache
             
-            with open(self.performance_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._load_performance_records()
+            if data is None:
+                return {'status': 'error', 'message': 'Henüz veri yok'}
             
             # M5 confirmation'lı sinyalleri filtrele
             m5_signals = [d for d in data if d.get('m5_confirmation_score', 0) > 0]
             
             if len(m5_signals) < 5:
-                return {'status': 'insufficient_data', 'message': f'M5 onaylı sadece {len(m5_signals)} sinyal var'}
+                result = {'status': 'insufficient_data', 'message': f'M5 onaylı sadece {len(m5_signals)} sinyal var'}
+                AIOptimizer._m5_analysis_key, AIOptimizer._m5_analysis_cache = cache_key, result
+                return result
+            
+            # Kolonları bir kez çıkar - aralık ve kombinasyon analizleri aynı dizileri kullanır
+            scores = np.array([s.get('m5_confirmation_score', 0) for s in m5_signals], dtype=np.float64)
+            succ = np.array([bool(s.get('success', False)) for s in m5_signals], dtype=np.float64)
+            profit = np.array([s.get('profit_loss_percent', 0) for s in m5_signals], dtype=np.float64)
+            c1 = np.array([s.get('m5_candle_1_score', 0) for s in m5_signals], dtype=np.int64)
+            c2 = np.array([s.get('m5_candle_2_score', 0) for s in m5_signals], dtype=np.int64)
             
             # Analiz sonuçları
             total_signals = len(m5_signals)
-            successful_signals = len([d for d in m5_signals if d.get('success', False)])
+            successful_signals = int(succ.sum())
             success_rate = (successful_signals / total_signals) * 100
             
-            # M5 skor aralıklarına göre başarı oranları
-            score_ranges = {
-                '60-70%': [d for d in m5_signals if 60 <= d.get('m5_confirmation_score', 0) < 70],
-                '70-80%': [d for d in m5_signals if 70 <= d.get('m5_confirmation_score', 0) < 80],
-                '80-90%': [d for d in m5_signals if 80 <= d.get('m5_confirmation_score', 0) < 90],
-                '90-100%': [d for d in m5_signals if 90 <= d.get('m5_confirmation_score', 0) <= 100]
-            }
+            # M5 skor aralıklarına göre başarı oranları - 60-70 / 70-80 / 80-90 / 90-100 (100 dahil)
+            in_range = (scores >= 60) & (scores <= 100)
+            range_idx = np.searchsorted(self.M5_SCORE_RANGE_EDGES, scores[in_range], side='right')
+            range_totals = np.bincount(range_idx, minlength=len(self.M5_SCORE_RANGE_LABELS))
+            range_hits = np.bincount(range_idx, weights=succ[in_range], minlength=len(self.M5_SCORE_RANGE_LABELS))
+            range_profits = np.bincount(range_idx, weights=profit[in_range], minlength=len(self.M5_SCORE_RANGE_LABELS))
             
             range_analysis = {}
-            for range_name, signals in score_ranges.items():
-                if len(signals) > 0:
-                    range_success = len([s for s in signals if s.get('success', False)])
+            for i, range_name in enumerate(self.M5_SCORE_RANGE_LABELS):
+                total = int(range_totals[i])
+                if total > 0:
+                    range_success = int(range_hits[i])
                     range_analysis[range_name] = {
-                        'total': len(signals),
+                        'total': total,
                         'successful': range_success,
-                        'success_rate': (range_success / len(signals)) * 100,
-                        'avg_profit': sum(s.get('profit_loss_percent', 0) for s in signals) / len(signals)
+                        'success_rate': (range_success / total) * 100,
+                        'avg_profit': float(range_profits[i] / total)
                     }
             
             # En iyi mum kombinasyonları
-            candle_combos = {}
-            for signal in m5_signals:
-                c1_score = signal.get('m5_candle_1_score', 0)
-                c2_score = signal.get('m5_candle_2_score', 0)
-                combo_key = f"{c1_score}/{c2_score}"
-                
-                if combo_key not in candle_combos:
-                    candle_combos[combo_key] = {'total': 0, 'successful': 0, 'profits': []}
-                
-                candle_combos[combo_key]['total'] += 1
-                if signal.get('success', False):
-                    candle_combos[combo_key]['successful'] += 1
-                candle_combos[combo_key]['profits'].append(signal.get('profit_loss_percent', 0))
+            # Mum puanları 0-10 aralığında: (c1, c2) çiftini 11x11 tabloya düzleştirip bincount ile topla
+            valid = (c1 >= 0) & (c1 <= 10) & (c2 >= 0) & (c2 <= 10)
+            combo_idx = c1[valid] * 11 + c2[valid]
+            totals = np.bincount(combo_idx, minlength=121)
+            hits = np.bincount(combo_idx, weights=succ[valid], minlength=121)
+            profit_sums = np.bincount(combo_idx, weights=profit[valid], minlength=121)
             
             # En iyi kombinasyonları sırala
             best_combos = []
-            for combo, stats in candle_combos.items():
-                if stats['total'] >= 3:  # En az 3 sinyal olmalı
-                    success_rate_combo = (stats['successful'] / stats['total']) * 100
-                    avg_profit = sum(stats['profits']) / len(stats['profits'])
-                    best_combos.append({
-                        'combo': combo,
-                        'success_rate': success_rate_combo,
-                        'avg_profit': avg_profit,
-                        'total_signals': stats['total']
-                    })
-            
-            best_combos.sort(key=lambda x: (x['success_rate'], x['avg_profit']), reverse=True)
+            for idx in np.flatnonzero(totals >= 3):  # En az 3 sinyal olmalı
+                c1_score, c2_score = divmod(int(idx), 11)
+                total = int(totals[idx])
+                best_combos.append({
+                    'combo': f"{c1_score}/{c2_score}",
+                    'success_rate': float(hits[idx] / total) * 100,
+                    'avg_profit': float(profit_sums[idx] / total),
+                    'total_signals': total
+                })
+            
+            # Yalnızca ilk 5 gerekli - tam sıralama yerine heap ile seç
+            best_combos = heapq.nlargest(5, best_combos, key=lambda x: (x['success_rate'], x['avg_profit']))
             
             result = {
                 'status': 'success',
                 'total_m5_signals': total_signals,
                 'overall_success_rate': success_rate,
                 'score_range_analysis': range_analysis,
-                'best_candle_combinations': best_combos[:5],  # Top 5
+                'best_candle_combinations': best_combos,  # Top 5
                 'recommendations': []
             }
             
@@ -521,6 +952,7 @@ class AIOptimizer:
                 best_range = max(range_analysis.items(), key=lambda x: x[1]['success_rate'])
                 result['recommendations'].append(f"🎯 En iyi performans: {best_range[0]} aralığında")
             
+            AIOptimizer._m5_analysis_key, AIOptimizer._m5_analysis_cache = cache_key, result
             return result
             
         except Exception as e:
@@ -553,6 +985,7 @@ class AIOptimizer:
         
         # Liquidity Sweep Settings
         self.liquidity_sweep_tolerance = 0.2    # Likidite sweep toleransı %
+        self._param_snapshot = None
         
     def optimize_strategy_parameters(self, failed_signals: list, market_conditions: dict):
         """
@@ -565,47 +998,22 @@ class AIOptimizer:
             if not hasattr(self, 'smc_entry_precision'):
                 self.__init_advanced_params()
             
-            optimizations = []
+            failure_counts = self._count_failures(failed_signals)
             
-            # 1. ENTRY PRECİSİON OPTİMİZASYONU
-            entry_optimization = self._optimize_entry_precision(failed_signals)
-            if entry_optimization['changed']:
-                optimizations.append(entry_optimization)
-            
-            # 2. TAKE PROFIT OPTİMİZASYONU
-            tp_optimization = self._optimize_take_profits(failed_signals)
-            if tp_optimization['changed']:
-                optimizations.append(tp_optimization)
-            
-            # 3. STOP LOSS OPTİMİZASYONU
-            sl_optimization = self._optimize_stop_loss(failed_signals)
-            if sl_optimization['changed']:
-                optimizations.append(sl_optimization)
-            
-            # 4. SMC KONFİRMASYON OPTİMİZASYONU
-            smc_optimization = self._optimize_smc_confirmation(failed_signals)
-            if smc_optimization['changed']:
-                optimizations.append(smc_optimization)
-            
-            # 5. ORDER BLOCK & FVG OPTİMİZASYONU
-            ob_fvg_optimization = self._optimize_ob_fvg(failed_signals)
-            if ob_fvg_optimization['changed']:
-                optimizations.append(ob_fvg_optimization)
-            
-            # 6. VOLUME ANALİZ OPTİMİZASYONU
-            volume_optimization = self._optimize_volume_analysis(failed_signals)
-            if volume_optimization['changed']:
-                optimizations.append(volume_optimization)
-            
-            # 7. LİKİDİTE SWEEP OPTİMİZASYONU
-            liquidity_optimization = self._optimize_liquidity_sweep(failed_signals)
-            if liquidity_optimization['changed']:
-                optimizations.append(liquidity_optimization)
+            # Kural grupları birbirinden bağımsız parametrelere yazar, sırayla çalıştırılır
+            optimizations = []
+            for rule in self.OPTIMIZATION_RULES:
+                optimization = self._apply_optimization_rule(rule, failure_counts)
+                if optimization['changed']:
+                    optimizations.append(optimization)
+                    self._settings_dirty = True
+            
+            # Ayarları yalnızca bir parametre değiştiyse tek seferde yaz
+            if self._settings_dirty:
+                self._save_advanced_settings()
             
             # Tüm optimizasyonları kaydet
             if optimizations:
-                self._save_advanced_settings()
-                
                 optimization_summary = {
                     'timestamp': datetime.now().isoformat(),
                     'total_failed_signals': len(failed_signals),
@@ -636,200 +1044,52 @@ class AIOptimizer:
             self.logger.error(f"Gelişmiş optimizasyon hatası: {e}")
             return {'success': False, 'error': str(e)}
     
-    def _optimize_entry_precision(self, failed_signals: list) -> dict:
-        """Entry precision optimizasyonu"""
-        try:
-            early_entries = [s for s in failed_signals if 'early_entry' in s.get('failure_reason', '')]
-            late_entries = [s for s in failed_signals if 'late_entry' in s.get('failure_reason', '')]
-            
-            old_precision = self.smc_entry_precision
-            
-            if len(early_entries) > len(late_entries):
-                # Çok erken giriş yapıyoruz, hassasiyeti artır
-                self.smc_entry_precision = min(1.0, self.smc_entry_precision + 0.1)
-            elif len(late_entries) > len(early_entries):
-                # Çok geç giriş yapıyoruz, hassasiyeti azalt
-                self.smc_entry_precision = max(0.5, self.smc_entry_precision - 0.1)
-            
-            return {
-                'parameter': 'entry_precision',
-                'old_value': old_precision,
-                'new_value': self.smc_entry_precision,
-                'changed': old_precision != self.smc_entry_precision,
-                'reason': f"Early entries: {len(early_entries)}, Late entries: {len(late_entries)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'entry_precision', 'error': str(e), 'changed': False}
-    
-    def _optimize_take_profits(self, failed_signals: list) -> dict:
-        """Take Profit optimizasyonu"""
-        try:
-            tp_missed = [s for s in failed_signals if 'tp_missed' in s.get('failure_reason', '')]
-            tp_too_close = [s for s in failed_signals if 'tp_too_close' in s.get('failure_reason', '')]
-            
-            old_tp1 = self.tp1_distance_multiplier
-            old_tp2 = self.tp2_distance_multiplier
-            old_tp3 = self.tp3_distance_multiplier
-            
-            if len(tp_missed) > 3:
-                # TP'ler çok uzak, yakınlaştır
-                self.tp1_distance_multiplier = max(0.8, self.tp1_distance_multiplier - 0.1)
-                self.tp2_distance_multiplier = max(1.5, self.tp2_distance_multiplier - 0.2)
-                self.tp3_distance_multiplier = max(2.0, self.tp3_distance_multiplier - 0.3)
-            elif len(tp_too_close) > 3:
-                # TP'ler çok yakın, uzaklaştır
-                self.tp1_distance_multiplier = min(1.5, self.tp1_distance_multiplier + 0.1)
-                self.tp2_distance_multiplier = min(3.0, self.tp2_distance_multiplier + 0.2)
-                self.tp3_distance_multiplier = min(4.0, self.tp3_distance_multiplier + 0.3)
-            
-            changed = (old_tp1 != self.tp1_distance_multiplier or 
-                      old_tp2 != self.tp2_distance_multiplier or 
-                      old_tp3 != self.tp3_distance_multiplier)
-            
-            return {
-                'parameter': 'take_profits',
-                'old_values': {'tp1': old_tp1, 'tp2': old_tp2, 'tp3': old_tp3},
-                'new_values': {'tp1': self.tp1_distance_multiplier, 'tp2': self.tp2_distance_multiplier, 'tp3': self.tp3_distance_multiplier},
-                'changed': changed,
-                'reason': f"TP missed: {len(tp_missed)}, TP too close: {len(tp_too_close)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'take_profits', 'error': str(e), 'changed': False}
-    
-    def _optimize_stop_loss(self, failed_signals: list) -> dict:
-        """Stop Loss optimizasyonu"""
-        try:
-            sl_hit = [s for s in failed_signals if 'stop_loss_hit' in s.get('failure_reason', '')]
-            sl_too_tight = [s for s in failed_signals if 'sl_too_tight' in s.get('failure_reason', '')]
-            
-            old_atr = self.sl_atr_multiplier
-            old_max = self.sl_percentage_max
-            
-            if len(sl_hit) > 5:
-                # SL çok dar, genişlet
-                self.sl_atr_multiplier = min(3.0, self.sl_atr_multiplier + 0.2)
-                self.sl_percentage_max = min(5.0, self.sl_percentage_max + 0.3)
-            elif len(sl_too_tight) > 3:
-                # SL çok geniş, daralt
-                self.sl_atr_multiplier = max(1.0, self.sl_atr_multiplier - 0.1)
-                self.sl_percentage_max = max(1.0, self.sl_percentage_max - 0.2)
-            
-            changed = (old_atr != self.sl_atr_multiplier or old_max != self.sl_percentage_max)
-            
-            return {
-                'parameter': 'stop_loss',
-                'old_values': {'atr_multiplier': old_atr, 'max_percentage': old_max},
-                'new_values': {'atr_multiplier': self.sl_atr_multiplier, 'max_percentage': self.sl_percentage_max},
-                'changed': changed,
-                'reason': f"SL hit: {len(sl_hit)}, SL too tight: {len(sl_too_tight)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'stop_loss', 'error': str(e), 'changed': False}
+    def _step_param(self, name: str, delta: float):
+        """Parametreyi delta kadar kaydır ve sınırları içinde tut"""
+        low, high = self.ADVANCED_PARAM_BOUNDS[name]
+        value = getattr(self, name) + delta
+        setattr(self, name, low if value < low else high if value > high else value)
+        self._param_snapshot = None
     
-    def _optimize_smc_confirmation(self, failed_signals: list) -> dict:
-        """SMC Confirmation optimizasyonu"""
-        try:
-            weak_confirmation = [s for s in failed_signals if s.get('m5_confirmation_score', 100) < 60]
-            
-            old_min = self.smc_confirmation_min
-            old_rr = self.smc_risk_reward_ratio
-            
-            if len(weak_confirmation) > 3:
-                # Zayıf konfirmasyonlar çok, eşikleri artır
-                self.smc_confirmation_min = min(80, self.smc_confirmation_min + 5)
-                self.smc_risk_reward_ratio = min(2.5, self.smc_risk_reward_ratio + 0.1)
-            
-            changed = (old_min != self.smc_confirmation_min or old_rr != self.smc_risk_reward_ratio)
-            
-            return {
-                'parameter': 'smc_confirmation',
-                'old_values': {'min_confirmation': old_min, 'risk_reward': old_rr},
-                'new_values': {'min_confirmation': self.smc_confirmation_min, 'risk_reward': self.smc_risk_reward_ratio},
-                'changed': changed,
-                'reason': f"Weak confirmations: {len(weak_confirmation)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'smc_confirmation', 'error': str(e), 'changed': False}
+    def _count_failures(self, failed_signals: list) -> Counter:
+        """Başarısız sinyalleri tek geçişte neden bazında say"""
+        counts = Counter()
+        for signal in failed_signals:
+            tokens = signal.get('failure_tokens')
+            if tokens is None:
+                # Eski format: nedenler '_' ile birleşik tek string, bilinen token'ları ara
+                reason = signal.get('failure_reason', '')
+                tokens = [token for token in self.FAILURE_TOKENS if token in reason]
+            counts.update(tokens)
+            # M5 skoru zayıf olanlar (SMC konfirmasyon optimizasyonu için)
+            if signal.get('m5_confirmation_score', 100) < 60:
+                counts['weak_confirmation'] += 1
+        return counts
     
-    def _optimize_ob_fvg(self, failed_signals: list) -> dict:
-        """Order Block & FVG optimizasyonu"""
-        try:
-            weak_ob = [s for s in failed_signals if 'weak_order_block' in s.get('failure_reason', '')]
-            small_fvg = [s for s in failed_signals if 'small_fvg' in s.get('failure_reason', '')]
-            
-            old_ob = self.ob_strength_min
-            old_fvg = self.fvg_size_min
-            
-            if len(weak_ob) > 2:
-                self.ob_strength_min = min(90, self.ob_strength_min + 5)
-            
-            if len(small_fvg) > 2:
-                self.fvg_size_min = min(1.0, self.fvg_size_min + 0.1)
-            
-            changed = (old_ob != self.ob_strength_min or old_fvg != self.fvg_size_min)
-            
-            return {
-                'parameter': 'ob_fvg',
-                'old_values': {'ob_strength': old_ob, 'fvg_size': old_fvg},
-                'new_values': {'ob_strength': self.ob_strength_min, 'fvg_size': self.fvg_size_min},
-                'changed': changed,
-                'reason': f"Weak OB: {len(weak_ob)}, Small FVG: {len(small_fvg)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'ob_fvg', 'error': str(e), 'changed': False}
-    
-    def _optimize_volume_analysis(self, failed_signals: list) -> dict:
-        """Volume Analysis optimizasyonu"""
-        try:
-            low_volume = [s for s in failed_signals if 'low_volume' in s.get('failure_reason', '')]
-            
-            old_volume = self.volume_threshold_multiplier
-            
-            if len(low_volume) > 4:
-                # Düşük hacim çok, eşiği artır
-                self.volume_threshold_multiplier = min(3.0, self.volume_threshold_multiplier + 0.2)
-            
-            changed = old_volume != self.volume_threshold_multiplier
-            
-            return {
-                'parameter': 'volume_analysis',
-                'old_value': old_volume,
-                'new_value': self.volume_threshold_multiplier,
-                'changed': changed,
-                'reason': f"Low volume signals: {len(low_volume)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'volume_analysis', 'error': str(e), 'changed': False}
-    
-    def _optimize_liquidity_sweep(self, failed_signals: list) -> dict:
-        """Liquidity Sweep optimizasyonu"""
-        try:
-            false_sweeps = [s for s in failed_signals if 'false_liquidity_sweep' in s.get('failure_reason', '')]
-            
-            old_tolerance = self.liquidity_sweep_tolerance
-            
-            if len(false_sweeps) > 2:
-                # Yanlış sweep'ler çok, toleransı azalt
-                self.liquidity_sweep_tolerance = max(0.1, self.liquidity_sweep_tolerance - 0.05)
-            
-            changed = old_tolerance != self.liquidity_sweep_tolerance
-            
-            return {
-                'parameter': 'liquidity_sweep',
-                'old_value': old_tolerance,
-                'new_value': self.liquidity_sweep_tolerance,
-                'changed': changed,
-                'reason': f"False sweeps: {len(false_sweeps)}"
-            }
-            
-        except Exception as e:
-            return {'parameter': 'liquidity_sweep', 'error': str(e), 'changed': False}
+    def _apply_optimization_rule(self, rule: Dict, failure_counts: Counter) -> dict:
+        """OPTIMIZATION_RULES içindeki tek bir kural grubunu uygula (hatalar optimize_strategy_parameters'ta yakalanır)"""
+        fields = rule['fields']
+        old_values = [getattr(self, name) for name, _ in fields]
+        
+        for token, limit, deltas in rule['steps']:
+            # limit sayı ise eşik, metin ise karşılaştırılacak diğer nedenin sayısı
+            if failure_counts[token] > (failure_counts[limit] if isinstance(limit, str) else limit):
+                for name, delta in deltas.items():
+                    self._step_param(name, delta)
+                if rule['first_match']:
+                    break
+        
+        new_values = [getattr(self, name) for name, _ in fields]
+        result = {'parameter': rule['parameter']}
+        if len(fields) == 1:
+            result['old_value'] = old_values[0]
+            result['new_value'] = new_values[0]
+        else:
+            result['old_values'] = {label: value for (_, label), value in zip(fields, old_values)}
+            result['new_values'] = {label: value for (_, label), value in zip(fields, new_values)}
+        result['changed'] = old_values != new_values
+        result['reason'] = rule['reason'].format_map(failure_counts)
+        return result
     
     def _save_advanced_settings(self):
         """Gelişmiş ayarları kaydet"""
@@ -870,8 +1130,7 @@ class AIOptimizer:
                 'last_updated': datetime.now().isoformat()
             }
             
-            with open(self.current_settings, 'w', encoding='utf-8') as f:
-                json.dump(advanced_settings, f, indent=2, ensure_ascii=False)
+            self._write_settings_file(advanced_settings)
                 
             self.logger.info("🤖 Gelişmiş AI ayarları kaydedildi")
             
@@ -879,10 +1138,16 @@ class AIOptimizer:
             self.logger.error(f"Gelişmiş ayarları kaydetme hatası: {e}")
     
     def get_optimized_parameters(self) -> dict:
-        """Optimize edilmiş parametreleri döndür"""
+        """Optimize edilmiş parametreleri döndür (parametre değişene kadar aynı dict, salt okunur kullanın)"""
         if not hasattr(self, 'smc_entry_precision'):
             self.__init_advanced_params()
-            
+        
+        if self._param_snapshot is None:
+            self._param_snapshot = self._build_param_snapshot()
+        return self._param_snapshot
+    
+    def _build_param_snapshot(self) -> dict:
+        """get_optimized_parameters için iç içe parametre sözlüğünü oluştur"""
         return {
             'smc': {
                 'entry_precision': self.smc_entry_precision,
@@ -916,27 +1181,20 @@ class AIOptimizer:
         }
     
     def _save_optimization_log(self, optimization_data: dict):
-        """Optimizasyon logunu kaydet"""
+        """Optimizasyon logunu JSONL dosyasının sonuna ekle"""
         try:
-            log_file = "data/ai_optimization_log.json"
-            
-            # Mevcut logu oku
-            if os.path.exists(log_file):
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-            
-            # Yeni log ekle
-            logs.append(optimization_data)
+            log_file = "data/ai_optimization_log.jsonl"
             
-            # Son 100 log kayıt tut
-            if len(logs) > 100:
-                logs = logs[-100:]
+            with open(log_file, 'ab') as f:
+                f.write(_json_dumps(optimization_data) + b"\n")
             
-            # Kaydet
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, indent=2, ensure_ascii=False)
+            # Son 100 log kayıt tut - her 20 eklemede bir kırp
+            self._optimization_log_appends += 1
+            if self._optimization_log_appends % 20 == 0:
+                with open(log_file, 'r', encoding='utf-8') as f:
+                    logs = deque(f, maxlen=100)
+                with open(log_file, 'w', encoding='utf-8') as f:
+                    f.writelines(logs)
                 
         except Exception as e:
             self.logger.error(f"Optimizasyon logu kaydetme hatası: {e}")
@@ -955,45 +1213,59 @@ class AIOptimizer:
                     'optimization_priority': 'maintain'
                 }
             
-            # 📊 Temel metrikler
             total_signals = len(failed_signals)
-            failure_types = [signal.get('failure_reason', 'unknown') for signal in failed_signals]
-            failure_scores = [signal.get('confidence_score', 0) for signal in failed_signals]
+            
+            # 🤫 Sakin piyasa: birkaç sinyal için kırılımlar anlamsız, kısaltılmış metrik döndür
+            if total_signals < self.MIN_SIGNALS_FOR_BREAKDOWN:
+                return {
+                    'success_rate': max(0, 100 - (total_signals * 10)),
+                    'avg_failure_score': float(sum(s.get('confidence_score', 0) for s in failed_signals) / total_signals),
+                    'dominant_failure_types': list(dict.fromkeys(s.get('failure_reason', 'unknown') for s in failed_signals)),
+                    'symbol_performance': {},
+                    'timeframe_performance': {},
+                    'optimization_priority': 'low',
+                    'reduced': True
+                }
+            
+            # 📊 Temel metrikler - sinyal alanlarını tek geçişte kolonlara ayır
+            failure_types = []
+            symbols = []
+            timestamps = []
+            failure_scores = np.empty(total_signals, dtype=np.float64)
+            
+            for i, signal in enumerate(failed_signals):
+                failure_types.append(signal.get('failure_reason', 'unknown'))
+                symbols.append(signal.get('symbol', 'unknown'))
+                failure_scores[i] = signal.get('confidence_score', 0)
+                
+                timestamp = signal.get('timestamp') or ''
+                timestamps.append(timestamp if isinstance(timestamp, str) else timestamp.isoformat())
+            
+            # ⏱️ Saatleri toplu çöz - ISO metnin 'YYYY-MM-DDTHH' kısmı yeterli, boş kayıtlar şimdiki saat
+            ts_strings = np.array(timestamps, dtype='U13')
+            has_ts = ts_strings != ''
+            hours = np.full(total_signals, datetime.now().hour, dtype=np.int64)
+            hours[has_ts] = ts_strings[has_ts].astype('datetime64[h]').astype(np.int64) % 24
             
             # 🎯 Dominant hata tipleri
-            from collections import Counter
             failure_counter = Counter(failure_types)
             dominant_failures = failure_counter.most_common(3)
             
-            # 📈 Sembol bazında performans
-            symbol_performance = {}
-            for signal in failed_signals:
-                symbol = signal.get('symbol', 'unknown')
-                if symbol not in symbol_performance:
-                    symbol_performance[symbol] = {'count': 0, 'avg_score': 0}
-                symbol_performance[symbol]['count'] += 1
-                symbol_performance[symbol]['avg_score'] += signal.get('confidence_score', 0)
-            
-            # Ortalama skorları hesapla
-            for symbol in symbol_performance:
-                if symbol_performance[symbol]['count'] > 0:
-                    symbol_performance[symbol]['avg_score'] /= symbol_performance[symbol]['count']
-            
-            # ⏰ Zaman bazında performans
-            timeframe_performance = {}
-            for signal in failed_signals:
-                timestamp = signal.get('timestamp', datetime.now())
-                if isinstance(timestamp, str):
-                    timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                hour = timestamp.hour
-                
-                if hour not in timeframe_performance:
-                    timeframe_performance[hour] = 0
-                timeframe_performance[hour] += 1
+            # 📈 Sembol bazında performans (np.unique + bincount)
+            unique_symbols, symbol_idx, symbol_counts = np.unique(symbols, return_inverse=True, return_counts=True)
+            symbol_score_sums = np.bincount(symbol_idx, weights=failure_scores, minlength=len(unique_symbols))
+            symbol_performance = {
+                str(symbol): {'count': int(count), 'avg_score': float(score_sum / count)}
+                for symbol, count, score_sum in zip(unique_symbols, symbol_counts, symbol_score_sums)
+            }
+            
+            # ⏰ Zaman bazında performans (saat histogramı)
+            hour_counts = np.bincount(hours, minlength=24)
+            timeframe_performance = {int(hour): int(hour_counts[hour]) for hour in np.flatnonzero(hour_counts)}
             
             return {
                 'success_rate': max(0, 100 - (total_signals * 10)),  # Her başarısız sinyal %10 düşürür
-                'avg_failure_score': sum(failure_scores) / len(failure_scores) if failure_scores else 0,
+                'avg_failure_score': float(failure_scores.mean()),
                 'dominant_failure_types': [f[0] for f in dominant_failures],
                 'symbol_performance': symbol_performance,
                 'timeframe_performance': timeframe_performance,
@@ -1014,15 +1286,7 @@ class AIOptimizer:
     def _determine_optimization_priority(self, failure_counter):
         """Hata sayısına göre optimizasyon önceliği belirle"""
         total_failures = sum(failure_counter.values())
-        
-        if total_failures >= 20:
-            return 'critical'
-        elif total_failures >= 10:
-            return 'high'
-        elif total_failures >= 5:
-            return 'medium'
-        else:
-            return 'low'
+        return self.PRIORITY_LABELS[bisect_right(self.PRIORITY_BINS, total_failures)]
     
     def save_optimization_result(self, optimization_type, old_params, new_params, performance_improvement):
         """Optimizasyon sonucunu kaydet"""
@@ -1038,10 +1302,17 @@ class AIOptimizer:
             
             self.optimization_history_data.append(result)
             
-            # Dosyaya kaydet
+            # Dosyanın sonuna ekle - her 50 eklemede bir son MAX_OPTIMIZATION_HISTORY satıra kırp
             os.makedirs('data', exist_ok=True)
-            with open(self.optimization_history, 'w') as f:
-                json.dump(self.optimization_history_data, f, indent=2)
+            with open(self.optimization_history, 'ab') as f:
+                f.write(_json_dumps(result) + b"\n")
+            
+            AIOptimizer._history_appends += 1
+            if AIOptimizer._history_appends % 50 == 0:
+                with open(self.optimization_history, 'rb') as f:
+                    lines = deque(f, maxlen=self.MAX_OPTIMIZATION_HISTORY)
+                with open(self.optimization_history, 'wb') as f:
+                    f.writelines(lines)
                 
             self.logger.info(f"✅ {optimization_type} optimizasyonu kaydedildi")
             
@@ -1053,7 +1324,7 @@ class AIOptimizer:
         recommendations = []
         
         priority = performance_metrics.get('optimization_priority', 'low')
-        dominant_failures = performance_metrics.get('dominant_failure_types', [])
+        dominant_failures = frozenset(performance_metrics.get('dominant_failure_types', ()))
         success_rate = performance_metrics.get('success_rate', 100)
         
         if success_rate < 50:
@@ -5,6 +5,7 @@ Performans takip ve gelişmiş analiz fonksiyonları
 
 import json
 import os
+import pandas as pd
 from datetime import datetime, timedelta
 from collections import Counter
 
@@ -21,45 +22,31 @@ def get_performance_metrics(self, failed_signals):
                 'optimization_priority': 'maintain'
             }
         
-        # 📊 Temel metrikler
+        # 📊 Temel metrikler - sinyalleri tek seferde kolonlara ayır
         total_signals = len(failed_signals)
-        failure_types = [signal.get('failure_reason', 'unknown') for signal in failed_signals]
-        failure_scores = [signal.get('confidence_score', 0) for signal in failed_signals]
+        df = pd.DataFrame.from_records(failed_signals, columns=['failure_reason', 'symbol', 'confidence_score', 'timestamp'])
+        df = df.fillna({'failure_reason': 'unknown', 'symbol': 'unknown', 'confidence_score': 0})
         
         # 🎯 Dominant hata tipleri
-        from collections import Counter
-        failure_counter = Counter(failure_types)
+        failure_counter = Counter(df['failure_reason'])
         dominant_failures = failure_counter.most_common(3)
         
         # 📈 Sembol bazında performans
-        symbol_performance = {}
-        for signal in failed_signals:
-            symbol = signal.get('symbol', 'unknown')
-            if symbol not in symbol_performance:
-                symbol_performance[symbol] = {'count': 0, 'avg_score': 0}
-            symbol_performance[symbol]['count'] += 1
-            symbol_performance[symbol]['avg_score'] += signal.get('confidence_score', 0)
-        
-        # Ortalama skorları hesapla
-        for symbol in symbol_performance:
-            if symbol_performance[symbol]['count'] > 0:
-                symbol_performance[symbol]['avg_score'] /= symbol_performance[symbol]['count']
+        symbol_stats = df.groupby('symbol', sort=False)['confidence_score'].agg(['count', 'mean'])
+        symbol_performance = {
+            symbol: {'count': int(count), 'avg_score': float(mean)}
+            for symbol, count, mean in symbol_stats.itertuples()
+        }
         
-        # ⏰ Zaman bazında performans
-        timeframe_performance = {}
-        for signal in failed_signals:
-            timestamp = signal.get('timestamp', datetime.now())
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            hour = timestamp.hour
-            
-            if hour not in timeframe_performance:
-                timeframe_performance[hour] = 0
-            timeframe_performance[hour] += 1
+        # ⏰ Zaman bazında performans - ISO metnin 'YYYY-MM-DDTHH' kısmı yeterli, eksikler şimdiki saat
+        timestamps = df['timestamp'].map(lambda ts: ts.isoformat() if isinstance(ts, datetime) else ts).astype('string')
+        hours = pd.to_datetime(timestamps.str.slice(0, 13), format='ISO8601').dt.hour
+        hours = hours.fillna(datetime.now().hour).astype(int)
+        timeframe_performance = {int(hour): int(count) for hour, count in hours.value_counts(sort=False).items()}
         
         return {
             'success_rate': max(0, 100 - (total_signals * 10)),  # Her başarısız sinyal %10 düşürür
-            'avg_failure_score': sum(failure_scores) / len(failure_scores) if failure_scores else 0,
+            'avg_failure_score': float(df['confidence_score'].mean()),
             'dominant_failure_types': [f[0] for f in dominant_failures],
             'symbol_performance': symbol_performance,
             'timeframe_performance': timeframe_performance,
@@ -119,7 +106,7 @@ def get_optimization_recommendations(self, performance_metrics):
     recommendations = []
     
     priority = performance_metrics.get('optimization_priority', 'low')
-    dominant_failures = performance_metrics.get('dominant_failure_types', [])
+    dominant_failures = frozenset(performance_metrics.get('dominant_failure_types', ()))
     success_rate = performance_metrics.get('success_rate', 100)
     
     if success_rate < 50:
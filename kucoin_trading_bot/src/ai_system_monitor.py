@@ -3,15 +3,58 @@
 Gelişmiş AI optimizasyon sisteminin durumunu izle
 """
 
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson yoksa standart json ile devam et
+    from json import loads as json_loads
+
+def _read_last_records(path: str, count: int) -> list:
+    """JSONL dosyasının son `count` kaydını sondan 4 KB'lık bloklarla okuyarak döndür"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        # count+1 satır sonu görülünce son count satırın tamamı elde edilmiş olur
+        while pos > 0 and data.count(b'\n') <= count:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = [line for line in data.splitlines() if line.strip()]
+    return [json_loads(line) for line in lines[-count:]]
+
+# 🗂️ Dosya önbelleği: path -> ((st_mtime_ns, st_size), ayrıştırılmış veri)
+_FILE_CACHE = {}
+
+def _read_json_file(path: str):
+    """JSON dosyasını tek seferde oku ve ayrıştır"""
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+def _load_if_changed(path: str, loader=_read_json_file):
+    """Dosya değişmediyse önbellekteki veriyi döndür, yoksa yeniden ayrıştır; dosya yoksa None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _FILE_CACHE.pop(path, None)
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _FILE_CACHE.get(path)
+    if cached is None or cached[0] != key:
+        cached = (key, loader(path))
+        _FILE_CACHE[path] = cached
+    # Çağıran tarafın değişiklikleri önbelleği bozmasın diye sığ kopya döndür
+    return cached[1].copy()
+
 def check_ai_system_status():
     """AI optimizasyon sisteminin durumunu kontrol et"""
     try:
+        now = datetime.now()  # Tek zaman damgası: hem rapor saati hem "bugün" filtresi için
         status = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'system_health': 'healthy',
             'components': {},
             'recent_optimizations': [],
@@ -19,30 +62,40 @@ def check_ai_system_status():
             'recommendations': []
         }
         
+        history_file = "data/optimization_history.jsonl"
+        legacy_history_file = "data/optimization_history.json"
+        signal_perf_files = ("data/signal_performance.jsonl", "data/signal_performance.json")
+        settings_file = "data/current_optimizer_settings.json"
+        
+        # ⚡ Birbirinden bağımsız dosya okumaları paralel yürütülür (I/O beklemeleri örtüşür)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            history_future = executor.submit(_load_if_changed, history_file, lambda path: _read_last_records(path, 5))  # Son 5 optimizasyon
+            legacy_future = executor.submit(_load_if_changed, legacy_history_file)
+            signal_future = executor.submit(lambda: any(os.path.exists(path) for path in signal_perf_files))
+            settings_future = executor.submit(_load_if_changed, settings_file)
+        
         # 📊 Optimizasyon geçmişini kontrol et
-        history_file = "data/optimization_history.json"
-        if os.path.exists(history_file):
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-                status['recent_optimizations'] = history[-5:]  # Son 5 optimizasyon
-                status['components']['optimization_history'] = 'active'
+        recent = history_future.result()
+        if recent is None:
+            legacy = legacy_future.result()
+            recent = legacy[-5:] if legacy is not None else None
+        if recent is not None:
+            status['recent_optimizations'] = recent
+            status['components']['optimization_history'] = 'active'
         else:
             status['components']['optimization_history'] = 'not_found'
         
         # 🎯 Signal tracker durumu
-        signal_perf_file = "data/signal_performance.json"
-        if os.path.exists(signal_perf_file):
+        if signal_future.result():
             status['components']['signal_tracker'] = 'active'
         else:
             status['components']['signal_tracker'] = 'not_found'
         
         # ⚙️ Mevcut ayarlar
-        settings_file = "data/current_optimizer_settings.json"
-        if os.path.exists(settings_file):
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
-                status['current_settings'] = settings
-                status['components']['settings'] = 'active'
+        settings = settings_future.result()
+        if settings is not None:
+            status['current_settings'] = settings
+            status['components']['settings'] = 'active'
         else:
             status['components']['settings'] = 'default'
         
@@ -62,13 +115,14 @@ def check_ai_system_status():
         # 📈 Performans özeti
         if status['recent_optimizations']:
             recent_opt = status['recent_optimizations'][-1]
+            today = now.strftime('%Y-%m-%d')
             status['performance_summary'] = {
                 'last_optimization': recent_opt.get('timestamp'),
                 'last_optimization_type': recent_opt.get('optimization_type'),
-                'total_optimizations_today': len([
-                    opt for opt in status['recent_optimizations'] 
-                    if opt.get('timestamp', '').startswith(datetime.now().strftime('%Y-%m-%d'))
-                ])
+                'total_optimizations_today': sum(
+                    1 for opt in status['recent_optimizations']
+                    if opt.get('timestamp', '').startswith(today)
+                )
             }
         
         return status
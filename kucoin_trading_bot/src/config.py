@@ -1,51 +1,73 @@
 import os
 import logging
+import logging.handlers
+from functools import lru_cache
+from typing import Dict
 from dotenv import load_dotenv
 
+@lru_cache(maxsize=1)
+def _load_env() -> Dict[str, str]:
+    """.env dosyasını süreç başına bir kez ayrıştır ve ortam değişkenlerinin anlık görüntüsünü döndür"""
+    load_dotenv()
+    return dict(os.environ)
+
+def _configure_logging_once():
+    """Logging konfigürasyonu (süreç başına bir kez)"""
+    if getattr(_configure_logging_once, '_done', False):
+        return
+        
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            # Log dosyası 10 MB'da döner, en fazla 3 yedek tutulur
+            logging.handlers.RotatingFileHandler('logs/trading_bot.log', maxBytes=10_000_000, backupCount=3),
+            logging.StreamHandler()
+        ]
+    )
+    
+    # HTTP isteklerini ve telegram loglarını sustur
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.getLogger('telegram').setLevel(logging.WARNING)
+    logging.getLogger('telegram.ext').setLevel(logging.WARNING)
+    
+    _configure_logging_once._done = True
+
 class Config:
+    _instance = None
+    
+    @classmethod
+    def instance(cls) -> 'Config':
+        """Paylaşılan Config örneğini döndür (ilk çağrıda oluşturulur)"""
+        if cls._instance is None:
+            _configure_logging_once()
+            cls._instance = cls()
+        return cls._instance
+        
     def __init__(self):
-        load_dotenv()
+        env = _load_env()
         
         # Telegram Configuration
-        self.TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-        self.TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+        self.TELEGRAM_BOT_TOKEN = env.get('TELEGRAM_BOT_TOKEN')
+        self.TELEGRAM_CHAT_ID = env.get('TELEGRAM_CHAT_ID')
         
         # KuCoin API Configuration
-        self.KUCOIN_API_KEY = os.getenv('KUCOIN_API_KEY', '')
-        self.KUCOIN_SECRET_KEY = os.getenv('KUCOIN_SECRET_KEY', '')
-        self.KUCOIN_PASSPHRASE = os.getenv('KUCOIN_PASSPHRASE', '')
-        self.KUCOIN_SANDBOX = os.getenv('KUCOIN_SANDBOX', 'False').lower() == 'true'
+        self.KUCOIN_API_KEY = env.get('KUCOIN_API_KEY', '')
+        self.KUCOIN_SECRET_KEY = env.get('KUCOIN_SECRET_KEY', '')
+        self.KUCOIN_PASSPHRASE = env.get('KUCOIN_PASSPHRASE', '')
+        self.KUCOIN_SANDBOX = env.get('KUCOIN_SANDBOX', 'False').lower() == 'true'
         
         # Trading Parameters
-        self.MIN_VOLUME_USDT = float(os.getenv('MIN_VOLUME_USDT', 5000000))  # 🚀 5M'a düşürüldü
-        self.ANALYSIS_INTERVAL = int(os.getenv('ANALYSIS_INTERVAL', 15))
-        self.VALIDATION_INTERVAL = int(os.getenv('VALIDATION_INTERVAL', 5))
-        self.MAX_SIGNALS_PER_HOUR = int(os.getenv('MAX_SIGNALS_PER_HOUR', 5))
+        self.MIN_VOLUME_USDT = float(env.get('MIN_VOLUME_USDT', 5000000))  # 🚀 5M'a düşürüldü
+        self.ANALYSIS_INTERVAL = int(env.get('ANALYSIS_INTERVAL', 15))
+        self.VALIDATION_INTERVAL = int(env.get('VALIDATION_INTERVAL', 5))
+        self.MAX_SIGNALS_PER_HOUR = int(env.get('MAX_SIGNALS_PER_HOUR', 5))
         
         # API Endpoints
         if self.KUCOIN_SANDBOX:
             self.KUCOIN_BASE_URL = 'https://openapi-sandbox.kucoin.com'
         else:
             self.KUCOIN_BASE_URL = 'https://api.kucoin.com'
-            
-        # Logging Configuration
-        self.setup_logging()
-        
-    def setup_logging(self):
-        """Logging konfigürasyonu"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/trading_bot.log'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        # HTTP isteklerini ve telegram loglarını sustur
-        logging.getLogger('httpx').setLevel(logging.WARNING)
-        logging.getLogger('telegram').setLevel(logging.WARNING)
-        logging.getLogger('telegram.ext').setLevel(logging.WARNING)
         
     def validate_config(self):
         """Gerekli konfigürasyonların kontrolü"""
@@ -1,14 +1,38 @@
+import asyncio
 import hashlib
 import hmac
 import base64
 import time
 import json
+import uuid
+import aiohttp
 import requests
 import logging
+import numpy as np
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
+from urllib.parse import urlencode
 from config import Config
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson yoksa standart json ile devam et
+    from json import loads as json_loads
+
 class KuCoinAPI:
+    SYMBOLS_CACHE_TTL_SECONDS = 3600  # Sembol metadata'sı saatler içinde nadiren değişir
+    # Ticker alanı -> coin verisindeki anahtar (sıra çıktı sözlüğündeki sırayı belirler)
+    TICKER_NUMERIC_FIELDS = {
+        'volValue': 'volume_usdt',
+        'last': 'price',
+        'changeRate': 'change_rate',
+        'high': 'high_24h',
+        'low': 'low_24h',
+        'vol': 'volume_24h'
+    }
+    
     def __init__(self, config: Config):
         self.config = config
         self.base_url = 'https://api.kucoin.com'  # Always use public API
@@ -17,6 +41,12 @@ class KuCoinAPI:
         self.passphrase = config.KUCOIN_PASSPHRASE
         self.logger = logging.getLogger(__name__)
         
+        # 🗂️ Sembol listesi TTL önbelleği ve ondan türetilen USDT sembol sözlüğü
+        self._symbols_cache: Optional[List[Dict]] = None
+        self._symbols_cache_ts = 0.0
+        self._symbols_etag: Optional[str] = None  # TTL dolunca koşullu GET (If-None-Match) için
+        self._usdt_symbol_info: Optional[Dict[str, Dict]] = None
+        
         # Public API endpoints (no auth required)
         self.use_public_api = not all([self.api_key, self.secret_key, self.passphrase])
         if self.use_public_api:
@@ -25,13 +55,39 @@ class KuCoinAPI:
         else:
             print("🔐 KuCoin Private API kullanılıyor")
             self.logger.info("Using KuCoin Private API")
+            # Süreç boyunca sabit: gizli anahtar baytları ve passphrase imzası bir kez hesaplanır
+            self._secret_bytes = self.secret_key.encode('utf-8')
+            self._passphrase_sig = base64.b64encode(
+                hmac.new(
+                    self._secret_bytes,
+                    self.passphrase.encode('utf-8'),
+                    hashlib.sha256
+                ).digest()
+            ).decode('utf-8')
+        
+        # 🔌 Kalıcı HTTP oturumu: aynı host'a keep-alive bağlantı havuzu (her istekte TCP+TLS el sıkışması yok)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self._session.mount('https://', adapter)
+        self._session.headers.update({'Content-Type': 'application/json'})
+        
+        # İstek yolu kurulumda bir kez seçilir; public modda imza dalı hiç çalışmaz
+        self._make_request = self._make_public_request if self.use_public_api else self._make_private_request
+        
+    def close(self):
+        """HTTP oturumunu ve havuzdaki bağlantıları kapat"""
+        self._session.close()
         
     def _generate_signature(self, timestamp: str, method: str, endpoint: str, body: str = '') -> str:
         """KuCoin API için imza oluşturma"""
         message = timestamp + method + endpoint + body
         signature = base64.b64encode(
             hmac.new(
-                self.secret_key.encode('utf-8'),
+                self._secret_bytes,
                 message.encode('utf-8'),
                 hashlib.sha256
             ).digest()
@@ -39,89 +95,118 @@ class KuCoinAPI:
         return signature
         
     def _generate_passphrase_signature(self) -> str:
-        """Passphrase imzası oluşturma"""
-        return base64.b64encode(
-            hmac.new(
-                self.secret_key.encode('utf-8'),
-                self.passphrase.encode('utf-8'),
-                hashlib.sha256
-            ).digest()
-        ).decode('utf-8')
+        """Passphrase imzası (__init__'te bir kez hesaplanır)"""
+        return self._passphrase_sig
         
-    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
-        """API isteği yapma"""
-        url = self.base_url + endpoint
+    @staticmethod
+    def _build_request_path(endpoint: str, params: Dict = None) -> str:
+        """Query string dahil istek yolu (imza ve URL aynı yolu kullanır)"""
+        return endpoint + ('?' + urlencode(params) if params else '')
         
-        if params:
-            query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-            url += '?' + query_string
+    def _make_public_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+        """Public API isteği - imza ve ek başlık hazırlığı yok"""
+        request_path = self._build_request_path(endpoint, params)
+        
+        try:
+            response = self._send(method, self.base_url + request_path, data=data)
+            if response.status_code >= 400:
+                # Fallback aynı public isteği tekrarlardı; doğrudan boş yanıt dön
+                self.logger.error(f"API isteği başarısız: HTTP {response.status_code} {request_path}")
+                return {}
+            return json_loads(response.content)
+            
+        except (requests.exceptions.RequestException, ValueError) as e:  # ValueError: bozuk JSON gövdesi
+            self.logger.error(f"API isteği başarısız: {e}")
+            return {}
             
+    def _make_private_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+        """İmzalı private API isteği"""
+        request_path = self._build_request_path(endpoint, params)
+        
+        timestamp = str(int(time.time() * 1000))
+        body = json.dumps(data) if data else ''
         headers = {
-            'Content-Type': 'application/json'
+            'KC-API-SIGN': self._generate_signature(timestamp, method, request_path, body),
+            'KC-API-TIMESTAMP': timestamp,
+            'KC-API-KEY': self.api_key,
+            'KC-API-PASSPHRASE': self._generate_passphrase_signature(),
+            'KC-API-KEY-VERSION': '2'
         }
         
-        # Eğer private API kullanılıyorsa imza ekle
-        if not self.use_public_api:
-            timestamp = str(int(time.time() * 1000))
-            request_endpoint = endpoint
-            if params:
-                request_endpoint += '?' + query_string
-                
-            body = json.dumps(data) if data else ''
-            signature = self._generate_signature(timestamp, method, request_endpoint, body)
-            passphrase_sig = self._generate_passphrase_signature()
-            
-            headers.update({
-                'KC-API-SIGN': signature,
-                'KC-API-TIMESTAMP': timestamp,
-                'KC-API-KEY': self.api_key,
-                'KC-API-PASSPHRASE': passphrase_sig,
-                'KC-API-KEY-VERSION': '2'
-            })
-        
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=30)
-            else:
-                raise ValueError(f"Desteklenmeyen HTTP method: {method}")
-                
-            response.raise_for_status()
-            return response.json()
+            response = self._send(method, self.base_url + request_path, headers=headers, data=data)
+            if response.status_code >= 400:
+                # HTTP hatası istisnasız ele alınır; public endpoint'leri dene
+                self.logger.error(f"API isteği başarısız: HTTP {response.status_code} {request_path}")
+                return self._fallback_public_request(request_path)
+            return json_loads(response.content)
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:  # ValueError: bozuk JSON gövdesi
             self.logger.error(f"API isteği başarısız: {e}")
             # Public endpoint'leri dene
-            return self._fallback_public_request(endpoint, params)
+            return self._fallback_public_request(request_path)
             
-    def _fallback_public_request(self, endpoint: str, params: Dict = None) -> Dict:
-        """Public API fallback"""
+    def _send(self, method: str, url: str, headers: Dict = None, data: Dict = None):
+        """HTTP isteğini oturum üzerinden gönder (Content-Type oturum seviyesinde ayarlı)"""
+        if method == 'GET':
+            return self._session.get(url, headers=headers, timeout=30)
+        elif method == 'POST':
+            return self._session.post(url, headers=headers, json=data, timeout=30)
+        else:
+            raise ValueError(f"Desteklenmeyen HTTP method: {method}")
+            
+    def _fallback_public_request(self, request_path: str) -> Dict:
+        """Public API fallback (request_path: query string dahil endpoint)"""
         try:
-            url = self.base_url + endpoint
-            if params:
-                query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-                url += '?' + query_string
-                
-            headers = {'Content-Type': 'application/json'}
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            response = self._session.get(self.base_url + request_path, timeout=30)
+            if response.status_code >= 400:
+                self.logger.error(f"Fallback request failed: HTTP {response.status_code}")
+                return {}
+            return json_loads(response.content)
         except Exception as e:
             self.logger.error(f"Fallback request failed: {e}")
             return {}
             
     def get_market_symbols(self) -> List[Dict]:
-        """Tüm market sembollerini getir"""
-        endpoint = '/api/v1/symbols'
-        response = self._make_request('GET', endpoint)
+        """Tüm market sembollerini getir (SYMBOLS_CACHE_TTL_SECONDS boyunca önbellekten)"""
+        if self._symbols_cache is not None and time.monotonic() - self._symbols_cache_ts < self.SYMBOLS_CACHE_TTL_SECONDS:
+            return self._symbols_cache
+            
+        response, etag = self._get_symbols_response()
+        if response is None:  # 304 Not Modified: önbellekteki liste hâlâ geçerli
+            self._symbols_cache_ts = time.monotonic()
+            return self._symbols_cache
         
         if response.get('code') == '200000':
-            return response.get('data', [])
+            self._symbols_cache = response.get('data', [])
+            self._symbols_cache_ts = time.monotonic()
+            self._symbols_etag = etag
+            self._usdt_symbol_info = None  # Yeni listeden yeniden kurulacak
+            return self._symbols_cache
         else:
             self.logger.error(f"Market sembolleri alınamadı: {response}")
             return []
             
+    def _get_symbols_response(self):
+        """Sembol listesini ETag ile koşullu iste; (yanıt, etag) döndür - 304 ise yanıt None"""
+        endpoint = '/api/v1/symbols'
+        headers = None
+        if self._symbols_etag and self._symbols_cache is not None:
+            headers = {'If-None-Match': self._symbols_etag}
+            
+        try:
+            response = self._session.get(self.base_url + endpoint, headers=headers, timeout=30)
+            if response.status_code == 304:
+                return None, self._symbols_etag
+            if response.status_code >= 400:
+                self.logger.error(f"API isteği başarısız: HTTP {response.status_code} {endpoint}")
+                return {}, None
+            return json_loads(response.content), response.headers.get('ETag')
+            
+        except (requests.exceptions.RequestException, ValueError) as e:  # ValueError: bozuk JSON gövdesi
+            self.logger.error(f"API isteği başarısız: {e}")
+            return {}, None
+            
     def get_24hr_stats(self) -> List[Dict]:
         """24 saatlik istatistikleri getir"""
         endpoint = '/api/v1/market/allTickers'
@@ -133,44 +218,59 @@ class KuCoinAPI:
             self.logger.error(f"24hr stats alınamadı: {response}")
             return []
             
-    def get_high_volume_coins(self, min_volume_usdt: float = 5000000) -> List[Dict]:
-        """Hacmi yüksek coinleri getir"""
+    def get_high_volume_coins(self, min_volume_usdt: float = 5000000, top_k: Optional[int] = None) -> List[Dict]:
+        """Hacmi yüksek coinleri getir (top_k verilirse yalnızca en yüksek hacimli top_k coin)"""
         stats = self.get_24hr_stats()
         symbols = self.get_market_symbols()
         
-        # Sembol bilgilerini dict'e çevir
-        symbol_info = {s['symbol']: s for s in symbols if s['quoteCurrency'] == 'USDT'}
-        
-        high_volume_coins = []
-        
-        for stat in stats:
-            symbol = stat.get('symbol')
-            if symbol in symbol_info:
-                try:
-                    volume_usdt = float(stat.get('volValue', 0))
-                    if volume_usdt >= min_volume_usdt:
-                        coin_data = {
-                            'symbol': symbol,
-                            'base_currency': symbol_info[symbol]['baseCurrency'],
-                            'quote_currency': symbol_info[symbol]['quoteCurrency'],
-                            'volume_usdt': volume_usdt,
-                            'price': float(stat.get('last', 0)),
-                            'change_rate': float(stat.get('changeRate', 0)),
-                            'high_24h': float(stat.get('high', 0)),
-                            'low_24h': float(stat.get('low', 0)),
-                            'volume_24h': float(stat.get('vol', 0))
-                        }
-                        high_volume_coins.append(coin_data)
-                except (ValueError, TypeError) as e:
-                    self.logger.warning(f"Coin verisi işlenirken hata: {symbol} - {e}")
-                    continue
-                    
-        # Hacime göre sırala
-        high_volume_coins.sort(key=lambda x: x['volume_usdt'], reverse=True)
-        
-        self.logger.info(f"{len(high_volume_coins)} adet yüksek hacimli coin bulundu")
+        # Sembol bilgilerini dict'e çevir (sembol listesi yenilenene kadar tekrar kullanılır)
+        symbol_info = self._usdt_symbol_info
+        if symbol_info is None:
+            symbol_info = {s['symbol']: s for s in symbols if s['quoteCurrency'] == 'USDT'}
+            if symbols:
+                self._usdt_symbol_info = symbol_info
+        
+        # 📊 Ticker listesini tek DataFrame'e çevirip sayısal alanları vektörel ayrıştır
+        df = pd.DataFrame(stats, columns=['symbol', *self.TICKER_NUMERIC_FIELDS])
+        df = df[df['symbol'].isin(symbol_info)]
+        values = df[list(self.TICKER_NUMERIC_FIELDS)]
+        try:
+            values = values.astype(np.float64)  # float() ile birebir aynı ayrıştırma
+        except (ValueError, TypeError):
+            # Ayrıştırılamayan değer varsa yalnızca o hücreler NaN olur
+            values = values.apply(lambda column: column.map(self._to_float))
+        
+        invalid = values.isna().any(axis=1)
+        if invalid.any():
+            self.logger.warning(f"Coin verisi işlenirken hata: {', '.join(df.loc[invalid, 'symbol'])}")
+            
+        values = values[~invalid & (values['volValue'] >= min_volume_usdt)]
+        total_count = len(values)
+        
+        # Hacime göre sırala; top_k varsa kısmi seçim (O(N log K)), eşitlikte ilk gelen önce
+        if top_k:
+            values = values.nlargest(top_k, 'volValue', keep='first')
+        else:
+            values = values.sort_values('volValue', ascending=False, kind='stable')
+        
+        coins = values.rename(columns=self.TICKER_NUMERIC_FIELDS)
+        coin_symbols = df.loc[values.index, 'symbol']
+        coins.insert(0, 'symbol', coin_symbols)
+        coins.insert(1, 'base_currency', coin_symbols.map(lambda symbol: symbol_info[symbol]['baseCurrency']))
+        coins.insert(2, 'quote_currency', coin_symbols.map(lambda symbol: symbol_info[symbol]['quoteCurrency']))
+        high_volume_coins = coins.to_dict('records')
+        
+        self.logger.info(f"{total_count} adet yüksek hacimli coin bulundu ({len(high_volume_coins)} döndürüldü)")
         return high_volume_coins
         
+    @staticmethod
+    def _to_float(value) -> float:
+        """Değeri float'a çevir; çevrilemezse NaN döndür"""
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return np.nan
+            
     def get_klines(self, symbol: str, interval: str = '15min', start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[List]:
         """Mum verileri getir"""
         endpoint = '/api/v1/market/candles'
@@ -207,4 +307,154 @@ class KuCoinAPI:
             return float(data.get('price', 0))
         else:
             self.logger.error(f"Gerçek zamanlı fiyat alınamadı {symbol}: {response}")
-            return None
\ No newline at end of file
+            return None
+            
+    def get_real_time_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Birden çok sembolün son fiyatını tek allTickers isteğiyle getir (symbol -> fiyat)"""
+        if not symbols:
+            return {}
+        
+        wanted = set(symbols)
+        prices = {}
+        for ticker in self.get_24hr_stats():
+            symbol = ticker.get('symbol')
+            if symbol in wanted:
+                price = self._to_float(ticker.get('last'))
+                if price == price:  # NaN (fiyatı olmayan ticker) atlanır
+                    prices[symbol] = price
+        return prices
+
+
+class AsyncKuCoinAPI:
+    """aiohttp tabanlı public market verisi istemcisi - async yollar event loop'u bloklamadan istek atar"""
+    
+    MAX_CONCURRENT_REQUESTS = 16  # Aynı anda uçuşta olabilecek istek sayısı
+    REQUEST_TIMEOUT_SECONDS = 10
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.base_url = 'https://api.kucoin.com'
+        self.logger = logging.getLogger(__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Toplu asyncio.gather çağrılarında eşzamanlılığı sınırlar
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Oturumu ilk kullanımda (çalışan event loop içinde) oluştur"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60, ttl_dns_cache=300),
+                headers={'Content-Type': 'application/json'},
+                timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT_SECONDS)
+            )
+        return self._session
+        
+    async def close(self):
+        """HTTP oturumunu kapat"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            
+    async def _make_request(self, endpoint: str, params: Dict = None, method: str = 'GET') -> Dict:
+        """Async public istek yapma"""
+        try:
+            async with self._semaphore:
+                async with self._get_session().request(method, self.base_url + endpoint, params=params) as response:
+                    if response.status >= 400:
+                        self.logger.error(f"Async API isteği başarısız: HTTP {response.status} {endpoint}")
+                        return {}
+                    return json_loads(await response.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.logger.error(f"Async API isteği başarısız: {e}")
+            return {}
+            
+    async def get_24hr_stats(self) -> List[Dict]:
+        """24 saatlik istatistikleri getir"""
+        response = await self._make_request('/api/v1/market/allTickers')
+        
+        if response.get('code') == '200000':
+            return response.get('data', {}).get('ticker', [])
+        else:
+            self.logger.error(f"24hr stats alınamadı: {response}")
+            return []
+            
+    async def get_klines(self, symbol: str, interval: str = '15min', start_time: Optional[int] = None, end_time: Optional[int] = None) -> List[List]:
+        """Mum verileri getir"""
+        params = {
+            'symbol': symbol,
+            'type': interval
+        }
+        
+        if start_time:
+            params['startAt'] = start_time
+        if end_time:
+            params['endAt'] = end_time
+            
+        response = await self._make_request('/api/v1/market/candles', params=params)
+        
+        if response.get('code') == '200000':
+            klines = response.get('data', [])
+            # KuCoin API'si tersine sıralı döndürür, düzeltelim
+            klines.reverse()
+            return klines
+        else:
+            self.logger.error(f"Klines alınamadı {symbol}: {response}")
+            return []
+            
+    async def get_real_time_price(self, symbol: str) -> Optional[float]:
+        """Gerçek zamanlı fiyat getir"""
+        response = await self._make_request('/api/v1/market/orderbook/level1', params={'symbol': symbol})
+        
+        if response.get('code') == '200000':
+            data = response.get('data', {})
+            return float(data.get('price', 0))
+        else:
+            self.logger.error(f"Gerçek zamanlı fiyat alınamadı {symbol}: {response}")
+            return None
+            
+    async def stream_tickers(self):
+        """'/market/ticker:all' WebSocket akışı - (sembol, fiyat) çiftleri üretir; bağlantı kapanınca biter"""
+        # Public WebSocket için geçici token ve sunucu adresi
+        response = await self._make_request('/api/v1/bullet-public', method='POST')
+        if response.get('code') != '200000':
+            self.logger.error(f"WebSocket token alınamadı: {response}")
+            return
+            
+        data = response.get('data', {})
+        server = data['instanceServers'][0]
+        ping_interval = server.get('pingInterval', 18000) / 1000
+        url = f"{server['endpoint']}?token={data['token']}&connectId={uuid.uuid4().hex}"
+        
+        # Uzun ömürlü bağlantı: REST oturumunun toplam istek zaman aşımı burada uygulanmaz
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.REQUEST_TIMEOUT_SECONDS)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.ws_connect(url) as ws:
+                await ws.send_str(json.dumps({
+                    'id': uuid.uuid4().hex,
+                    'type': 'subscribe',
+                    'topic': '/market/ticker:all',
+                    'privateChannel': False,
+                    'response': True
+                }))
+                
+                last_ping = time.monotonic()
+                while True:
+                    # Sunucu pingInterval içinde ping bekler, aksi halde bağlantıyı kapatır
+                    if time.monotonic() - last_ping >= ping_interval:
+                        await ws.send_str(json.dumps({'id': uuid.uuid4().hex, 'type': 'ping'}))
+                        last_ping = time.monotonic()
+                        
+                    try:
+                        msg = await ws.receive(timeout=ping_interval)
+                    except asyncio.TimeoutError:
+                        continue
+                        
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        self.logger.warning(f"Ticker WebSocket bağlantısı kapandı: {msg.type}")
+                        return
+                        
+                    payload = json_loads(msg.data)
+                    if payload.get('type') != 'message':
+                        continue  # welcome / ack / pong
+                    price = payload.get('data', {}).get('price')
+                    if price is not None:
+                        yield payload.get('subject'), float(price)
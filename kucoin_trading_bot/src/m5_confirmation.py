@@ -2,19 +2,53 @@
 M5 Confirmation System - 2 Mum Onay Sistemi
 """
 
-import pandas as pd
+import inspect
 import numpy as np
 import logging
 import time
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
 
 class M5ConfirmationSystem:
+    # Kline satırı: timestamp, open, close, high, low, volume, turnover
+    CANDLE_SLICE = slice(1, 6)  # open, close, high, low, volume
+    
+    # Toplu skorlamada kural maskelerinin yöne göre açıklamaları
+    CANDLE_DETAILS = {
+        'LONG': {
+            'touch': "✅ OB/FVG bölgesine dokundu",
+            'strong_wick': "✅ Güçlü alt fitil rejection",
+            'mid_wick': "🟡 Orta seviye rejection",
+            'strong_body': "✅ Güçlü bullish mum",
+            'weak_body': "🟡 Zayıf bullish mum",
+            'volume': "✅ Hacim mevcut",
+            'beyond': "✅ Bölgenin üstünde kapanış",
+            'inside': "🟡 Bölge içinde kapanış",
+            'strong_type': 'strong_bullish'
+        },
+        'SHORT': {
+            'touch': "✅ OB/FVG bölgesine dokundu",
+            'strong_wick': "✅ Güçlü üst fitil rejection",
+            'mid_wick': "🟡 Orta seviye rejection",
+            'strong_body': "✅ Güçlü bearish mum",
+            'weak_body': "🟡 Zayıf bearish mum",
+            'volume': "✅ Hacim mevcut",
+            'beyond': "✅ Bölgenin altında kapanış",
+            'inside': "🟡 Bölge içinde kapanış",
+            'strong_type': 'strong_bearish'
+        }
+    }
+    
+    # Kural puanları; maskelerle tek tensordot ile toplanır (en fazla 10 puan)
+    RULE_WEIGHTS = {
+        'touch': 3, 'strong_wick': 2, 'mid_wick': 1, 'strong_body': 2,
+        'weak_body': 1, 'volume': 1, 'beyond': 2, 'inside': 1
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-    async def confirm_signal_on_m5(self, symbol: str, signal: Dict, kucoin_api) -> Dict:
-        """M5'te 2 mum onay sistemi"""
+    async def confirm_signal_on_m5(self, symbol: str, signal: Dict, kucoin_api, current_time: Optional[int] = None) -> Dict:
+        """M5'te 2 mum onay sistemi (current_time: tarama boyunca paylaşılan pencere sonu, unix saniye)"""
         try:
             confirmation_result = {
                 'confirmed': False,
@@ -25,33 +59,27 @@ class M5ConfirmationSystem:
             }
             
             # M5 data al - son 1 saat (12 mum)
-            current_time = int(time.time())
+            if current_time is None:
+                current_time = int(time.time())
             start_time = current_time - (60 * 60)  # 1 saat öncesi
             
             m5_klines = kucoin_api.get_klines(symbol, "5min", start_time=start_time, end_time=current_time)
+            if inspect.isawaitable(m5_klines):  # AsyncKuCoinAPI: event loop'u bloklamadan bekle
+                m5_klines = await m5_klines
             if m5_klines is None or len(m5_klines) < 3:
                 confirmation_result['reason'] = "M5 data yetersiz"
                 return confirmation_result
             
-            # Klines'ı DataFrame'e çevir
-            df_columns = ['timestamp', 'open', 'close', 'high', 'low', 'volume', 'turnover']
-            m5_data = pd.DataFrame(m5_klines, columns=df_columns)
-            
-            # Veri tiplerini düzelt
-            for col in ['open', 'close', 'high', 'low', 'volume', 'turnover']:
-                m5_data[col] = pd.to_numeric(m5_data[col], errors='coerce')
-            
             # Signal type'a göre onay ara
             signal_type = signal.get('signal', '').upper()
-            
-            if signal_type == "LONG":
-                return await self._confirm_long_signal(m5_data, signal, confirmation_result)
-            elif signal_type == "SHORT":
-                return await self._confirm_short_signal(m5_data, signal, confirmation_result)
-            else:
+            if signal_type not in self.CANDLE_DETAILS:
                 confirmation_result['reason'] = "Geçersiz signal type"
                 return confirmation_result
                 
+            # Son 2 mum, toplu yol ile aynı branchless çekirdekte skorlanır
+            self._score_batch([(0, signal, signal_type, m5_klines[-2:])], [confirmation_result])
+            return confirmation_result
+                
         except Exception as e:
             self.logger.error(f"M5 onay sistemi hatası: {e}")
             return {
@@ -62,74 +90,77 @@ class M5ConfirmationSystem:
                 'confirmation_strength': 0
             }
     
-    async def _confirm_long_signal(self, m5_data: pd.DataFrame, signal: Dict, result: Dict) -> Dict:
-        """LONG sinyali M5 onayı"""
-        try:
-            # Son 2 mumu analiz et
-            candle_1 = m5_data.iloc[-2]  # Bir önceki mum
-            candle_2 = m5_data.iloc[-1]  # Son mum
-            
-            confirmation_points = 0
-            max_points = 10
-            
-            # OB/FVG bölgesine dokunma kontrolü
-            ob_fvg_zone = self._get_ob_fvg_zone(signal)
-            
-            # 1. MUM ANALİZİ (Candle 1)
-            candle_1_analysis = self._analyze_candle_for_long(candle_1, ob_fvg_zone, "Mum 1")
-            result['candle_analysis'].append(candle_1_analysis)
-            confirmation_points += candle_1_analysis['points']
-            
-            # 2. MUM ANALİZİ (Candle 2) 
-            candle_2_analysis = self._analyze_candle_for_long(candle_2, ob_fvg_zone, "Mum 2")
-            result['candle_analysis'].append(candle_2_analysis)
-            confirmation_points += candle_2_analysis['points']
-            
-            # GENEL DEĞERLENDİRME
-            result['confirmation_strength'] = (confirmation_points / max_points) * 100
+    async def confirm_batch(self, signals: List[Dict], klines_map: Dict[str, List]) -> List[Dict]:
+        """Birden çok sinyali tek vektörel NumPy geçişinde M5 onayından geçir (klines_map: symbol -> M5 klines)"""
+        results = []
+        batch = []  # (sonuç indeksi, sinyal, yön, son 2 mum)
+        
+        for signal in signals:
+            result = {
+                'confirmed': False,
+                'reason': '',
+                'candle_analysis': [],
+                'final_entry_price': signal.get('entry_price', 0),
+                'confirmation_strength': 0
+            }
+            klines = klines_map.get(signal.get('symbol'))
+            signal_type = signal.get('signal', '').upper()
             
-            # Onay kriterleri
-            if confirmation_points >= 6:  # %60 başarı
-                result['confirmed'] = True
-                result['reason'] = f"M5 onayı başarılı - {confirmation_points}/{max_points} puan"
-                # En son mumun close'unu entry price olarak kullan
-                result['final_entry_price'] = float(candle_2['close'])
+            if klines is None or len(klines) < 3:
+                result['reason'] = "M5 data yetersiz"
+            elif signal_type not in self.CANDLE_DETAILS:
+                result['reason'] = "Geçersiz signal type"
             else:
-                result['confirmed'] = False
-                result['reason'] = f"M5 onayı yetersiz - {confirmation_points}/{max_points} puan"
+                batch.append((len(results), signal, signal_type, klines[-2:]))
+            results.append(result)
             
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"LONG onay analizi hatası: {e}")
-            result['confirmed'] = False
-            result['reason'] = f"LONG onay hatası: {e}"
-            return result
+        if batch:
+            self._score_batch(batch, results)
+        return results
     
-    async def _confirm_short_signal(self, m5_data: pd.DataFrame, signal: Dict, result: Dict) -> Dict:
-        """SHORT sinyali M5 onayı"""
+    def _score_batch(self, batch: List, results: List[Dict]) -> None:
+        """(sonuç indeksi, sinyal, yön, son 2 mum) kayıtlarını tek NumPy geçişinde skorlayıp sonuçlara yaz"""
         try:
-            # Son 2 mumu analiz et
-            candle_1 = m5_data.iloc[-2]  # Bir önceki mum
-            candle_2 = m5_data.iloc[-1]  # Son mum
-            
-            confirmation_points = 0
-            max_points = 10
-            
-            # OB/FVG bölgesine dokunma kontrolü
-            ob_fvg_zone = self._get_ob_fvg_zone(signal)
-            
-            # 1. MUM ANALİZİ (Candle 1)
-            candle_1_analysis = self._analyze_candle_for_short(candle_1, ob_fvg_zone, "Mum 1")
-            result['candle_analysis'].append(candle_1_analysis)
-            confirmation_points += candle_1_analysis['points']
-            
-            # 2. MUM ANALİZİ (Candle 2)
-            candle_2_analysis = self._analyze_candle_for_short(candle_2, ob_fvg_zone, "Mum 2")
-            result['candle_analysis'].append(candle_2_analysis)
-            confirmation_points += candle_2_analysis['points']
-            
-            # GENEL DEĞERLENDİRME
+            # (N, 2, 5) mum tensörü: open, close, high, low, volume
+            rows = [row for _, _, _, last_two in batch for row in last_two]
+            candles = self._klines_to_array(rows)[:, self.CANDLE_SLICE].reshape(len(batch), 2, 5)
+            
+            zones = [self._get_ob_fvg_zone(signal) for _, signal, _, _ in batch]
+            tops = np.array([[zone['top']] for zone in zones], dtype=np.float64)
+            bottoms = np.array([[zone['bottom']] for zone in zones], dtype=np.float64)
+            is_long = np.array([[signal_type == 'LONG'] for _, _, signal_type, _ in batch])
+            
+            masks = self._score_candle_masks(candles, tops, bottoms, is_long)
+            # (R, N, 2) maske yığını x (R,) ağırlık: tüm kurallar tek geçişte puanlanır
+            stacked = np.stack([masks[rule] for rule in self.RULE_WEIGHTS])
+            weights = np.fromiter(self.RULE_WEIGHTS.values(), dtype=np.int64)
+            points = np.tensordot(weights, stacked, axes=1)
+            totals = points.sum(axis=1)
+        except Exception as e:
+            self.logger.error(f"M5 onay skorlama hatası: {e}")
+            for idx, _, _, _ in batch:
+                results[idx]['reason'] = f"Onay sistemi hatası: {e}"
+            return
+            
+        max_points = 10
+        for k, (idx, signal, signal_type, _) in enumerate(batch):
+            result = results[idx]
+            labels = self.CANDLE_DETAILS[signal_type]
+            
+            for j, candle_name in enumerate(("Mum 1", "Mum 2")):
+                analysis = {
+                    'candle': candle_name,
+                    'points': int(points[k, j]),
+                    'details': [labels[rule] for rule in labels if rule in masks and masks[rule][k, j]],
+                    'candle_type': 'neutral'
+                }
+                if masks['touch'][k, j]:
+                    analysis['candle_type'] = 'zone_touch'
+                if masks['strong_body'][k, j]:
+                    analysis['candle_type'] = labels['strong_type']
+                result['candle_analysis'].append(analysis)
+                
+            confirmation_points = int(totals[k])
             result['confirmation_strength'] = (confirmation_points / max_points) * 100
             
             # Onay kriterleri
@@ -137,27 +168,61 @@ class M5ConfirmationSystem:
                 result['confirmed'] = True
                 result['reason'] = f"M5 onayı başarılı - {confirmation_points}/{max_points} puan"
                 # En son mumun close'unu entry price olarak kullan
-                result['final_entry_price'] = float(candle_2['close'])
+                result['final_entry_price'] = float(candles[k, 1, 1])
             else:
                 result['confirmed'] = False
                 result['reason'] = f"M5 onayı yetersiz - {confirmation_points}/{max_points} puan"
-            
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"SHORT onay analizi hatası: {e}")
-            result['confirmed'] = False
-            result['reason'] = f"SHORT onay hatası: {e}"
-            return result
+    
+    def _score_candle_masks(self, candles: np.ndarray, tops: np.ndarray, bottoms: np.ndarray, is_long: np.ndarray) -> Dict[str, np.ndarray]:
+        """(N, 2, 5) mumlar için her kuralın (N, 2) boolean maskesini hesapla - LONG/SHORT aynı geçişte"""
+        open_price, close, high, low, volume = np.moveaxis(candles, -1, 0)
+        
+        body_size = np.abs(close - open_price)
+        candle_range = high - low
+        # LONG için alt fitil, SHORT için üst fitil rejection sayılır
+        wick = np.where(is_long, np.minimum(open_price, close) - low, high - np.maximum(open_price, close))
+        touch_level = np.where(is_long, bottoms, tops)
+        
+        strong_wick = wick > body_size * 1.5
+        directional = np.where(is_long, close > open_price, close < open_price)
+        strong_body = directional & (body_size > candle_range * 0.6)
+        beyond = np.where(is_long, close > tops, close < bottoms)
+        
+        return {
+            'touch': (low <= touch_level) & (touch_level <= high),
+            'strong_wick': strong_wick,
+            'mid_wick': ~strong_wick & (wick > body_size),
+            'strong_body': strong_body,
+            'weak_body': directional & ~strong_body,
+            'volume': volume > 0,
+            'beyond': beyond,
+            'inside': ~beyond & np.where(is_long, close > bottoms, close < tops)
+        }
+    
+    def _klines_to_array(self, klines: List[List]) -> np.ndarray:
+        """Klines listesini float64 diziye çevir; ayrıştırılamayan alanlar NaN olur"""
+        try:
+            return np.asarray(klines, dtype=np.float64)
+        except (ValueError, TypeError):
+            return np.array([[self._to_float(value) for value in row] for row in klines], dtype=np.float64)
+    
+    @staticmethod
+    def _to_float(value) -> float:
+        """Değeri float'a çevir; çevrilemezse NaN döndür"""
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return np.nan
     
     def _get_ob_fvg_zone(self, signal: Dict) -> Dict:
         """OB/FVG bölge bilgilerini al"""
         try:
             # Signal içinden zone bilgilerini çıkar
             zone_info = signal.get('zone_info', {})
+            entry_price = signal.get('entry_price', 0)
             return {
-                'top': zone_info.get('top', signal.get('entry_price', 0) * 1.002),
-                'bottom': zone_info.get('bottom', signal.get('entry_price', 0) * 0.998),
+                'top': zone_info.get('top', entry_price * 1.002),
+                'bottom': zone_info.get('bottom', entry_price * 0.998),
                 'type': zone_info.get('type', 'unknown')
             }
         except:
@@ -167,139 +232,3 @@ class M5ConfirmationSystem:
                 'bottom': entry_price * 0.998,
                 'type': 'estimated'
             }
-    
-    def _analyze_candle_for_long(self, candle: pd.Series, ob_fvg_zone: Dict, candle_name: str) -> Dict:
-        """LONG için mum analizi"""
-        try:
-            analysis = {
-                'candle': candle_name,
-                'points': 0,
-                'details': [],
-                'candle_type': 'neutral'
-            }
-            
-            high = float(candle['high'])
-            low = float(candle['low'])
-            open_price = float(candle['open'])
-            close = float(candle['close'])
-            
-            body_size = abs(close - open_price)
-            candle_range = high - low
-            upper_wick = high - max(open_price, close)
-            lower_wick = min(open_price, close) - low
-            
-            # 1. OB/FVG bölgesine dokunma (3 puan)
-            if low <= ob_fvg_zone['bottom'] <= high:
-                analysis['points'] += 3
-                analysis['details'].append("✅ OB/FVG bölgesine dokundu")
-                analysis['candle_type'] = 'zone_touch'
-            
-            # 2. Rejection (Fitil tepkisi) (2 puan)
-            if lower_wick > body_size * 1.5:  # Alt fitil gövdeden büyük
-                analysis['points'] += 2
-                analysis['details'].append("✅ Güçlü alt fitil rejection")
-            elif lower_wick > body_size:
-                analysis['points'] += 1
-                analysis['details'].append("🟡 Orta seviye rejection")
-                
-            # 3. Bullish mum (2 puan)
-            if close > open_price:
-                if body_size > candle_range * 0.6:  # Güçlü yeşil mum
-                    analysis['points'] += 2
-                    analysis['details'].append("✅ Güçlü bullish mum")
-                    analysis['candle_type'] = 'strong_bullish'
-                else:
-                    analysis['points'] += 1
-                    analysis['details'].append("🟡 Zayıf bullish mum")
-            
-            # 4. Hacim kontrolü (1 puan) - varsa
-            if hasattr(candle, 'volume') and candle['volume'] > 0:
-                analysis['points'] += 1
-                analysis['details'].append("✅ Hacim mevcut")
-            
-            # 5. Kapanış bölgenin üstünde (2 puan)
-            if close > ob_fvg_zone['top']:
-                analysis['points'] += 2
-                analysis['details'].append("✅ Bölgenin üstünde kapanış")
-            elif close > ob_fvg_zone['bottom']:
-                analysis['points'] += 1
-                analysis['details'].append("🟡 Bölge içinde kapanış")
-            
-            return analysis
-            
-        except Exception as e:
-            self.logger.error(f"LONG mum analizi hatası: {e}")
-            return {
-                'candle': candle_name,
-                'points': 0,
-                'details': [f"❌ Analiz hatası: {e}"],
-                'candle_type': 'error'
-            }
-    
-    def _analyze_candle_for_short(self, candle: pd.Series, ob_fvg_zone: Dict, candle_name: str) -> Dict:
-        """SHORT için mum analizi"""
-        try:
-            analysis = {
-                'candle': candle_name,
-                'points': 0,
-                'details': [],
-                'candle_type': 'neutral'
-            }
-            
-            high = float(candle['high'])
-            low = float(candle['low'])
-            open_price = float(candle['open'])
-            close = float(candle['close'])
-            
-            body_size = abs(close - open_price)
-            candle_range = high - low
-            upper_wick = high - max(open_price, close)
-            lower_wick = min(open_price, close) - low
-            
-            # 1. OB/FVG bölgesine dokunma (3 puan)
-            if low <= ob_fvg_zone['top'] <= high:
-                analysis['points'] += 3
-                analysis['details'].append("✅ OB/FVG bölgesine dokundu")
-                analysis['candle_type'] = 'zone_touch'
-            
-            # 2. Rejection (Fitil tepkisi) (2 puan)
-            if upper_wick > body_size * 1.5:  # Üst fitil gövdeden büyük
-                analysis['points'] += 2
-                analysis['details'].append("✅ Güçlü üst fitil rejection")
-            elif upper_wick > body_size:
-                analysis['points'] += 1
-                analysis['details'].append("🟡 Orta seviye rejection")
-                
-            # 3. Bearish mum (2 puan)
-            if close < open_price:
-                if body_size > candle_range * 0.6:  # Güçlü kırmızı mum
-                    analysis['points'] += 2
-                    analysis['details'].append("✅ Güçlü bearish mum")
-                    analysis['candle_type'] = 'strong_bearish'
-                else:
-                    analysis['points'] += 1
-                    analysis['details'].append("🟡 Zayıf bearish mum")
-            
-            # 4. Hacim kontrolü (1 puan)
-            if hasattr(candle, 'volume') and candle['volume'] > 0:
-                analysis['points'] += 1
-                analysis['details'].append("✅ Hacim mevcut")
-            
-            # 5. Kapanış bölgenin altında (2 puan)
-            if close < ob_fvg_zone['bottom']:
-                analysis['points'] += 2
-                analysis['details'].append("✅ Bölgenin altında kapanış")
-            elif close < ob_fvg_zone['top']:
-                analysis['points'] += 1
-                analysis['details'].append("🟡 Bölge içinde kapanış")
-            
-            return analysis
-            
-        except Exception as e:
-            self.logger.error(f"SHORT mum analizi hatası: {e}")
-            return {
-                'candle': candle_name,
-                'points': 0,
-                'details': [f"❌ Analiz hatası: {e}"],
-                'candle_type': 'error'
-            }
\ No newline at end of file
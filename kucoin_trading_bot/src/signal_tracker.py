@@ -1,14 +1,34 @@
 import json
 import logging
 import asyncio
+import os
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 import uuid
-from dataclasses import dataclass, asdict
+from bisect import bisect_left
+import numpy as np
+from collections import Counter, deque
+from dataclasses import dataclass
 from enum import Enum
-from kucoin_api import KuCoinAPI
+from kucoin_api import AsyncKuCoinAPI, KuCoinAPI
 from telegram_bot import TelegramBot
 
+try:
+    import orjson
+except ImportError:  # orjson yoksa standart json ile devam et
+    orjson = None
+
+
+def _json_dumps(obj) -> bytes:
+    """Kompakt JSON'u UTF-8 bytes olarak üret - orjson varsa Rust encoder'ı kullan"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 class SignalStatus(Enum):
     ACTIVE = "active"
     TP1_HIT = "tp1_hit"
@@ -18,8 +38,22 @@ class SignalStatus(Enum):
     EXPIRED = "expired"
     CANCELLED = "cancelled"
 
+# Başarısızlık analizinde kullanılan analysis_data göstergeleri
+FAILURE_INDICATOR_KEYS = ('m5_confirmation_score', 'adx_value', 'volume_score')
+
+# Stop Loss nedeni: max zarar yüzdesinin aştığı eşik sayısı -> neden (eşikler kesin büyüktür)
+STOP_LOSS_REASON_THRESHOLDS = (1, 3, 5)
+STOP_LOSS_REASONS = ("Teknik seviye kırılması", "Düzeltme hareketi", "Trend değişimi", "Güçlü tersine hareket")
+
 @dataclass
 class TrackedSignal:
+    # 🧱 Sabit alanlar - __dict__ yerine slot erişimi (dataclass(slots=True) Python 3.10 gerektirir)
+    __slots__ = (
+        'signal_id', 'symbol', 'signal_type', 'entry_price', 'current_price', 'stop_loss',
+        'tp1', 'tp2', 'tp3', 'status', 'created_at', 'updated_at', 'hit_tp_levels',
+        'max_profit_percentage', 'max_loss_percentage', 'notifications_sent', 'analysis_data'
+    )
+    
     signal_id: str
     symbol: str
     signal_type: str
@@ -32,39 +66,151 @@ class TrackedSignal:
     status: SignalStatus
     created_at: datetime
     updated_at: datetime
-    hit_tp_levels: List[int]
+    hit_tp_levels: int  # Bit maskesi: TPk vurduysa (1 << k) biti set (JSON'da liste olarak saklanır)
     max_profit_percentage: float
     max_loss_percentage: float
     notifications_sent: List[str]
     analysis_data: Dict
+
+    @property
+    def direction(self) -> int:
+        """Yön işareti: LONG için +1, SHORT için -1 (kar hesabında dallanmayı önler)"""
+        return 1 if self.signal_type == "LONG" else -1
+    
+    def has_hit_tp(self, tp_level: int) -> bool:
+        """TP seviyesi vuruldu mu (bit maskesi kontrolü)"""
+        return bool(self.hit_tp_levels & (1 << tp_level))
+    
+    @property
+    def hit_tp_list(self) -> List[int]:
+        """Vurulan TP seviyeleri artan sırada"""
+        return [tp_level for tp_level in (1, 2, 3) if self.hit_tp_levels & (1 << tp_level)]
+    
+    def to_dict(self) -> Dict:
+        """JSON'a yazılabilir dict (asdict'in özyinelemeli derin kopyası olmadan, doğrudan alan erişimi)"""
+        return {
+            'signal_id': self.signal_id,
+            'symbol': self.symbol,
+            'signal_type': self.signal_type,
+            'entry_price': self.entry_price,
+            'current_price': self.current_price,
+            'stop_loss': self.stop_loss,
+            'tp1': self.tp1,
+            'tp2': self.tp2,
+            'tp3': self.tp3,
+            'status': self.status.value,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'hit_tp_levels': self.hit_tp_list,  # Eski kayıtlarla uyumlu liste biçimi
+            'max_profit_percentage': self.max_profit_percentage,
+            'max_loss_percentage': self.max_loss_percentage,
+            'notifications_sent': self.notifications_sent,
+            'analysis_data': self.analysis_data
+        }
     
 class SignalTracker:
-    def __init__(self, kucoin_api: KuCoinAPI, telegram_bot: TelegramBot):
+    def __init__(self, kucoin_api: KuCoinAPI, telegram_bot: TelegramBot, ticker_stream: Optional[AsyncKuCoinAPI] = None):
         self.api = kucoin_api
         self.telegram_bot = telegram_bot
+        self.ticker_stream = ticker_stream  # Verilirse fiyatlar WebSocket ticker akışından okunur
         self.logger = logging.getLogger(__name__)
         
         self.active_signals: Dict[str, TrackedSignal] = {}
-        self.completed_signals: List[TrackedSignal] = []
-        self.signal_history_file = 'data/signal_history.json'
+        self.signal_history_file = 'data/signal_history.jsonl'  # Her satır bir tamamlanan sinyal
+        self.legacy_signal_history_file = 'data/signal_history.json'
+        self.signal_archive_file = 'data/signal_history_archive.jsonl'
         self.active_signals_file = 'data/active_signals.json'
+        # Append-only değişiklik günlüğü (WAL): anlık görüntü + günlük tekrar oynatılarak yüklenir
+        self.active_signals_wal = 'data/active_signals.wal'
         
         # Tracking ayarları
         self.max_signal_age_hours = 24
+        self._max_signal_age = timedelta(hours=self.max_signal_age_hours)  # Yaş kontrolünde bölme yok
         self.price_check_interval = 30  # saniye
         self.max_active_signals = 20
+        self.max_completed_signals = 5000
+        self.active_save_interval = 300  # saniye - yalnızca fiyat değişiminde periyodik kayıt
+        self.wal_compact_every = 100  # Bu kadar WAL kaydından sonra anlık görüntü yeniden yazılır
+        self.notification_queue_size = 256
+        self.notification_put_timeout = 5  # saniye - dolu kuyrukta SL bildirimi için bekleme sınırı
+        self.stream_price_max_age = 60  # saniye - daha eski akış fiyatı için REST'e düşülür
+        
+        # 📨 Telegram bildirim kuyruğu: tick döngüsü ağ gecikmesini beklemez (ilk bildirimde başlar)
+        self._notify_queue: Optional[asyncio.Queue] = None
+        self._notify_worker: Optional[asyncio.Task] = None
+        
+        # 📡 WebSocket ticker akışından son fiyatlar (sembol -> fiyat / monotonic alınma zamanı)
+        self._last_price: Dict[str, float] = {}
+        self._last_price_at: Dict[str, float] = {}
+        self._ticker_worker: Optional[asyncio.Task] = None
+        
+        # 💾 Olay güdümlü kayıt: durum değişiklikleri WAL'a tek satır eklenir,
+        # tam anlık görüntü yalnızca periyodik olarak / sıkıştırmada yazılır
+        self._last_active_save = 0.0
+        self._active_wal_appends = 0
+        self._history_file_records = 0  # Geçmiş dosyasındaki satır sayısı (2x tampon boyutunu aşınca kırpılır)
+        
+        # 🔁 Sınırlı halka tampon: bellek sabit, geçmiş dosyası en fazla 2x tampon boyutunda kalır,
+        # taşan en eski sinyaller arşiv JSONL dosyasına eklenir
+        self.completed_signals: Deque[TrackedSignal] = deque(maxlen=self.max_completed_signals)
+        
+        # 🗂️ Status -> aktif sinyal ID'leri indeksi (durum sorguları tüm sinyalleri taramaz)
+        self._by_status: Dict[SignalStatus, set] = {status: set() for status in SignalStatus}
+        # 📊 Özet sayaçları değişiklik anında güncellenir (özet çağrısı sinyalleri taramaz)
+        self._symbol_counts: Counter = Counter()
+        self._performance_counts: Counter = Counter()
         
     def is_symbol_already_active(self, symbol: str, signal_type: str) -> bool:
         """Aynı symbol ve tipte aktif sinyal var mı kontrol et"""
-        for signal in self.active_signals.values():
-            if signal.symbol == symbol and signal.signal_type == signal_type and signal.status == SignalStatus.ACTIVE:
+        for signal_id in self._by_status[SignalStatus.ACTIVE]:
+            signal = self.active_signals[signal_id]
+            if signal.symbol == symbol and signal.signal_type == signal_type:
                 return True
         return False
         
+    def is_at_capacity(self) -> bool:
+        """Aktif sinyal sayısı max_active_signals sınırına ulaştı mı"""
+        return len(self.active_signals) >= self.max_active_signals
+        
+    def _set_status(self, signal: TrackedSignal, status: SignalStatus):
+        """Sinyal durumunu değiştir ve status indeksini güncelle"""
+        self._by_status[signal.status].discard(signal.signal_id)
+        signal.status = status
+        if signal.signal_id in self.active_signals:
+            self._by_status[status].add(signal.signal_id)
+        
+    def _rebuild_status_index(self):
+        """Status indeksini ve özet sayaçlarını aktif sinyallerden yeniden kur (yüklemeden sonra)"""
+        for signal_ids in self._by_status.values():
+            signal_ids.clear()
+        self._symbol_counts.clear()
+        self._performance_counts.clear()
+        for signal_id, signal in self.active_signals.items():
+            self._by_status[signal.status].add(signal_id)
+            self._count_signal(signal, 1)
+            
+    def _count_signal(self, signal: TrackedSignal, delta: int):
+        """Sinyalin özet sayaçlarına katkısını ekle (delta=1) ya da çıkar (delta=-1)"""
+        self._symbol_counts[signal.symbol] += delta
+        if self._symbol_counts[signal.symbol] <= 0:
+            del self._symbol_counts[signal.symbol]
+        if signal.max_profit_percentage > 0:
+            self._performance_counts['profitable_signals'] += delta
+        if signal.max_loss_percentage > 0:
+            self._performance_counts['losing_signals'] += delta
+        for tp_level in signal.hit_tp_list:
+            self._performance_counts[f'tp{tp_level}_hits'] += delta
+        
     def create_signal(self, signal_data: Dict) -> str:
-        """Yeni sinyal oluştur ve takibe başla"""
+        """Yeni sinyal oluştur ve takibe başla (max_active_signals doluysa reddedilir)"""
         try:
+            # Sınırsız büyüme yok: tick döngüsü ve kayıtlar en fazla max_active_signals sinyal işler
+            if self.is_at_capacity():
+                self.logger.warning(f"Aktif sinyal sınırı dolu ({self.max_active_signals}), sinyal reddedildi: {signal_data.get('symbol')}")
+                return ""
+                
             signal_id = str(uuid.uuid4())
+            now = datetime.now()
             
             tracked_signal = TrackedSignal(
                 signal_id=signal_id,
@@ -77,9 +223,9 @@ class SignalTracker:
                 tp2=signal_data['take_profits']['tp2'],
                 tp3=signal_data['take_profits']['tp3'],
                 status=SignalStatus.ACTIVE,
-                created_at=datetime.now(),
-                updated_at=datetime.now(),
-                hit_tp_levels=[],
+                created_at=now,
+                updated_at=now,
+                hit_tp_levels=0,
                 max_profit_percentage=0.0,
                 max_loss_percentage=0.0,
                 notifications_sent=[],
@@ -87,7 +233,9 @@ class SignalTracker:
             )
             
             self.active_signals[signal_id] = tracked_signal
-            self._save_active_signals()
+            self._by_status[SignalStatus.ACTIVE].add(signal_id)
+            self._count_signal(tracked_signal, 1)
+            self._append_active_wal(signal_id, tracked_signal)
             
             self.logger.info(f"Yeni sinyal oluşturuldu: {signal_id} - {signal_data['symbol']}")
             return signal_id
@@ -102,138 +250,231 @@ class SignalTracker:
             return
             
         try:
-            # Tüm aktif sinyallerin fiyatlarını kontrol et
-            for signal_id, signal in list(self.active_signals.items()):
-                try:
-                    # Güncel fiyatı al
-                    current_price = self.api.get_real_time_price(signal.symbol)
-                    if current_price is None:
-                        continue
-                        
-                    # Fiyatı güncelle
-                    signal.current_price = current_price
-                    signal.updated_at = datetime.now()
+            # Tick zamanı bir kez alınır; tüm sinyaller aynı zaman damgasını paylaşır
+            now = datetime.now()
+            
+            # Tüm sembollerin fiyatları tek toplu istekle alınır (sinyal başına istek yok)
+            symbols = {signal.symbol for signal in self.active_signals.values()}
+            prices = await self._fetch_prices(symbols)
+            
+            # Tüm aktif sinyallerin fiyatlarını güncelle
+            # (bu döngü sözlüğü değiştirmez: kopya ve sinyal başına try/except yok, hatalar tek seferde loglanır)
+            updated = []
+            errors = []
+            for signal in self.active_signals.values():
+                # Güncel fiyatı al
+                current_price = prices.get(signal.symbol)
+                if current_price is None:
+                    continue
+                if not signal.entry_price:
+                    errors.append((signal.signal_id, "geçersiz giriş fiyatı"))
+                    continue
                     
-                    # Kar/Zarar yüzdelerini hesapla
-                    if signal.signal_type == "LONG":
-                        profit_percentage = ((current_price - signal.entry_price) / signal.entry_price) * 100
-                    else:  # SHORT
-                        profit_percentage = ((signal.entry_price - current_price) / signal.entry_price) * 100
-                        
-                    # Max kar/zarar güncelle
-                    if profit_percentage > signal.max_profit_percentage:
-                        signal.max_profit_percentage = profit_percentage
-                    elif profit_percentage < 0 and abs(profit_percentage) > signal.max_loss_percentage:
-                        signal.max_loss_percentage = abs(profit_percentage)
-                        
-                    # TP ve SL kontrolü
-                    await self._check_tp_sl_levels(signal)
+                # Fiyatı güncelle
+                signal.current_price = current_price
+                signal.updated_at = now
+                
+                # Kar/Zarar yüzdelerini hesapla
+                profit_percentage = ((signal.direction * (current_price - signal.entry_price)) / signal.entry_price) * 100
+                    
+                # Max kar/zarar güncelle
+                # (ilk kez kâra/zarara geçişte özet sayacı artar)
+                if profit_percentage > signal.max_profit_percentage:
+                    if signal.max_profit_percentage <= 0:
+                        self._performance_counts['profitable_signals'] += 1
+                    signal.max_profit_percentage = profit_percentage
+                elif profit_percentage < 0 and abs(profit_percentage) > signal.max_loss_percentage:
+                    if signal.max_loss_percentage <= 0:
+                        self._performance_counts['losing_signals'] += 1
+                    signal.max_loss_percentage = abs(profit_percentage)
+                updated.append(signal)
                     
+            # TP ve SL kontrolü tüm sinyaller için tek vektörel geçişte
+            try:
+                events = self._tp_sl_events(updated)
+            except Exception as e:
+                self.logger.error(f"TP/SL kontrol hatası: {e}")
+                events = np.zeros(len(updated), dtype=np.int64)
+                
+            # Yalnızca olay çıkan veya süresi dolan sinyaller için async işlem
+            # (aktif sözlüğü değiştirebilen tek kısım; hata yalnızca o sinyali etkiler)
+            for signal, event in zip(updated, events.tolist()):
+                if not event and not self._is_signal_expired(signal, now):
+                    continue
+                try:
+                    if event < 0:
+                        await self._hit_stop_loss(signal, now)
+                    elif event > 0:
+                        await self._hit_take_profit(signal, event, now)
+                        
                     # Sinyal yaşı kontrolü
-                    if self._is_signal_expired(signal):
+                    if self._is_signal_expired(signal, now):
                         await self._expire_signal(signal)
                         
                 except Exception as e:
-                    self.logger.error(f"Sinyal fiyat güncelleme hatası {signal_id}: {e}")
-                    continue
+                    errors.append((signal.signal_id, e))
                     
-            # Güncellenmiş sinyalleri kaydet
-            self._save_active_signals()
+            if errors:
+                details = ", ".join(f"{signal_id}: {error}" for signal_id, error in errors)
+                self.logger.error(f"Sinyal fiyat güncelleme hatası ({len(errors)} sinyal): {details}")
+                    
+            # Durum değişiklikleri WAL'da; fiyat alanları kayıt aralığı dolunca anlık görüntüye yazılır
+            if time.monotonic() - self._last_active_save >= self.active_save_interval:
+                self._save_active_signals()
             
         except Exception as e:
             self.logger.error(f"Genel fiyat güncelleme hatası: {e}")
             
-    async def _check_tp_sl_levels(self, signal: TrackedSignal):
-        """TP ve SL seviyelerini kontrol et"""
-        try:
-            current_price = signal.current_price
+    async def _fetch_prices(self, symbols) -> Dict[str, float]:
+        """Fiyatları al: önce WebSocket akışındaki taze fiyatlar, kalanlar toplu REST isteği,
+        toplu yanıtta da olmayan semboller eşzamanlı tekil isteklerle tamamlanır"""
+        prices = self._streamed_prices(symbols)
+        pending = [symbol for symbol in symbols if symbol not in prices]
+        if not pending:
+            return prices  # Akış sağlıklıyken tick ağ isteği yapmaz
             
-            if signal.signal_type == "LONG":
-                # LONG pozisyon kontrolleri
-                
-                # Stop Loss kontrolü
-                if current_price <= signal.stop_loss and signal.status == SignalStatus.ACTIVE:
-                    await self._hit_stop_loss(signal)
-                    return
-                    
-                # TP kontrolleri
-                if current_price >= signal.tp3 and 3 not in signal.hit_tp_levels:
-                    await self._hit_take_profit(signal, 3)
-                elif current_price >= signal.tp2 and 2 not in signal.hit_tp_levels:
-                    await self._hit_take_profit(signal, 2)
-                elif current_price >= signal.tp1 and 1 not in signal.hit_tp_levels:
-                    await self._hit_take_profit(signal, 1)
-                    
-            else:  # SHORT pozisyon
+        # Toplu REST isteği (büyük allTickers yanıtı) thread'de çalışır; event loop bloklanmaz
+        prices.update(await asyncio.to_thread(self.api.get_real_time_prices, pending))
+        missing = [symbol for symbol in pending if symbol not in prices]
+        if missing:
+            # Tek gather: ağ gecikmeleri üst üste biner (süre ~N*RTT yerine ~RTT)
+            results = await asyncio.gather(*[self._fetch_price(symbol) for symbol in missing], return_exceptions=True)
+            for symbol, price in zip(missing, results):
+                if isinstance(price, Exception):
+                    self.logger.error(f"Fiyat alma hatası {symbol}: {price}")
+                elif price is not None:
+                    prices[symbol] = price
+        return prices
+        
+    def _streamed_prices(self, symbols) -> Dict[str, float]:
+        """WebSocket akışından gelen, yeterince taze fiyatlar (akış yoksa ilk çağrıda başlatılır)"""
+        if self.ticker_stream is None:
+            return {}
+        if self._ticker_worker is None or self._ticker_worker.done():
+            self._ticker_worker = asyncio.create_task(self._ws_ticker_worker())
+            
+        oldest = time.monotonic() - self.stream_price_max_age
+        return {
+            symbol: self._last_price[symbol]
+            for symbol in symbols
+            if self._last_price_at.get(symbol, oldest) > oldest
+        }
+        
+    async def _ws_ticker_worker(self):
+        """KuCoin '/market/ticker:all' akışını dinleyip son fiyatları güncelle (kopunca yeniden bağlanır)"""
+        retry_delay = 1
+        while True:
+            try:
+                async for symbol, price in self.ticker_stream.stream_tickers():
+                    self._last_price[symbol] = price
+                    self._last_price_at[symbol] = time.monotonic()
+                    retry_delay = 1
+            except Exception as e:
+                self.logger.error(f"Ticker WebSocket hatası: {e}")
                 
-                # Stop Loss kontrolü
-                if current_price >= signal.stop_loss and signal.status == SignalStatus.ACTIVE:
-                    await self._hit_stop_loss(signal)
-                    return
-                    
-                # TP kontrolleri
-                if current_price <= signal.tp3 and 3 not in signal.hit_tp_levels:
-                    await self._hit_take_profit(signal, 3)
-                elif current_price <= signal.tp2 and 2 not in signal.hit_tp_levels:
-                    await self._hit_take_profit(signal, 2)
-                elif current_price <= signal.tp1 and 1 not in signal.hit_tp_levels:
-                    await self._hit_take_profit(signal, 1)
-                    
-        except Exception as e:
-            self.logger.error(f"TP/SL kontrol hatası {signal.signal_id}: {e}")
+            # Üstel geri çekilme ile yeniden bağlan (en fazla 1 dakika)
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 60)
+            
+    async def stop_ticker_stream(self):
+        """WebSocket ticker akışını durdur (kapanışta)"""
+        if self._ticker_worker is None or self._ticker_worker.done():
+            return
+        self._ticker_worker.cancel()
+        try:
+            await self._ticker_worker
+        except asyncio.CancelledError:
+            pass
             
-    async def _hit_take_profit(self, signal: TrackedSignal, tp_level: int):
-        """Take Profit seviyesi vurdu"""
+    async def _fetch_price(self, symbol: str) -> Optional[float]:
+        """Tekil fiyat isteğini event loop'u bloklamadan thread'de çalıştır"""
+        return await asyncio.to_thread(self.api.get_real_time_price, symbol)
+        
+    def _tp_sl_events(self, signals: List[TrackedSignal]) -> np.ndarray:
+        """Tüm sinyaller için TP/SL olaylarını tek NumPy geçişinde hesapla (-1: SL, 0: yok, k: TPk)"""
+        if not signals:
+            return np.zeros(0, dtype=np.int64)
+            
+        # SoA düzeni: her alan bir sütun (yön +1 LONG / -1 SHORT ile LONG/SHORT aynı formül)
+        fields = np.array([
+            (signal.direction, signal.current_price, signal.stop_loss, signal.tp1, signal.tp2, signal.tp3,
+             signal.status == SignalStatus.ACTIVE,
+             signal.has_hit_tp(1), signal.has_hit_tp(2), signal.has_hit_tp(3))
+            for signal in signals
+        ], dtype=np.float64)
+        direction, price, stop_loss = fields[:, 0], fields[:, 1], fields[:, 2]
+        take_profits = fields[:, 3:6]
+        is_active = fields[:, 6].astype(bool)
+        already_hit = fields[:, 7:10].astype(bool)
+        
+        # Stop Loss yalnızca henüz TP vurmamış (ACTIVE) sinyallerde
+        sl_hit = is_active & (direction * (price - stop_loss) <= 0)
+        tp_reached = (direction[:, None] * (price[:, None] - take_profits) >= 0) & ~already_hit
+        # Aynı tick'te tek TP: öncelik TP3 > TP2 > TP1
+        tp_level = np.select([tp_reached[:, 2], tp_reached[:, 1], tp_reached[:, 0]], [3, 2, 1], default=0)
+        return np.where(sl_hit, -1, tp_level)
+            
+    async def _hit_take_profit(self, signal: TrackedSignal, tp_level: int, now: datetime):
+        """Take Profit seviyesi vurdu (now: tick zamanı)"""
         try:
-            signal.hit_tp_levels.append(tp_level)
-            signal.updated_at = datetime.now()
+            signal.hit_tp_levels |= 1 << tp_level
+            self._performance_counts[f'tp{tp_level}_hits'] += 1
+            signal.updated_at = now
             
             # Status güncelle
             if tp_level == 1:
-                signal.status = SignalStatus.TP1_HIT
+                self._set_status(signal, SignalStatus.TP1_HIT)
             elif tp_level == 2:
-                signal.status = SignalStatus.TP2_HIT
+                self._set_status(signal, SignalStatus.TP2_HIT)
             elif tp_level == 3:
-                signal.status = SignalStatus.TP3_HIT
+                self._set_status(signal, SignalStatus.TP3_HIT)
                 
-            # Telegram bildirimi gönder
+            # Telegram bildirimi kuyruğa ekle (gönderim arka planda)
             notification_key = f"tp{tp_level}"
             if notification_key not in signal.notifications_sent:
-                await self.telegram_bot.send_tp_update(
+                queued = await self._enqueue_notification(
+                    self.telegram_bot.send_tp_update,
                     signal.signal_id, 
                     tp_level, 
                     signal.current_price, 
                     signal.symbol
                 )
-                signal.notifications_sent.append(notification_key)
+                if queued:
+                    signal.notifications_sent.append(notification_key)
                 
             self.logger.info(f"TP{tp_level} vurdu: {signal.symbol} - {signal.current_price}")
             
-            # TP3 vurduysa sinyali tamamla
+            # TP3 vurduysa sinyali tamamla, değilse yeni durumu WAL'a yaz
             if tp_level == 3:
                 await self._complete_signal(signal, "TP3 vurdu")
+            else:
+                self._append_active_wal(signal.signal_id, signal)
                 
         except Exception as e:
             self.logger.error(f"TP hit işlemi hatası: {e}")
             
-    async def _hit_stop_loss(self, signal: TrackedSignal):
-        """Stop Loss vurdu"""
+    async def _hit_stop_loss(self, signal: TrackedSignal, now: datetime):
+        """Stop Loss vurdu (now: tick zamanı)"""
         try:
-            signal.status = SignalStatus.STOP_LOSS
-            signal.updated_at = datetime.now()
+            self._set_status(signal, SignalStatus.STOP_LOSS)
+            signal.updated_at = now
             
             # SL nedenini analiz et
-            reason = await self._analyze_stop_loss_reason(signal)
+            reason = self._analyze_stop_loss_reason(signal)
             
-            # Telegram bildirimi gönder
+            # Telegram bildirimi kuyruğa ekle (gönderim arka planda)
+            # SL bildirimi atlanmaz: kuyruk doluysa sınırlı süre yer açılması beklenir
             if "stop_loss" not in signal.notifications_sent:
-                await self.telegram_bot.send_sl_update(
+                queued = await self._enqueue_notification(
+                    self.telegram_bot.send_sl_update,
                     signal.signal_id,
                     signal.current_price,
                     signal.symbol,
-                    reason
+                    reason,
+                    wait=self.notification_put_timeout
                 )
-                signal.notifications_sent.append("stop_loss")
+                if queued:
+                    signal.notifications_sent.append("stop_loss")
                 
             self.logger.info(f"Stop Loss vurdu: {signal.symbol} - {signal.current_price}")
             
@@ -243,20 +484,53 @@ class SignalTracker:
         except Exception as e:
             self.logger.error(f"Stop Loss işlemi hatası: {e}")
             
-    async def _analyze_stop_loss_reason(self, signal: TrackedSignal) -> str:
+    async def _enqueue_notification(self, send, *args, wait: float = 0) -> bool:
+        """Bildirimi sınırlı arka plan kuyruğuna ekle; kuyruğa girdiyse True döner.
+        Kuyruk doluysa en fazla `wait` saniye yer açılması beklenir, yine dolu kalırsa bildirim atlanır"""
+        if self._notify_worker is None or self._notify_worker.done():
+            if self._notify_queue is None:
+                self._notify_queue = asyncio.Queue(maxsize=self.notification_queue_size)
+            self._notify_worker = asyncio.create_task(self._notification_worker())
+            
+        try:
+            self._notify_queue.put_nowait((send, args))
+            return True
+        except asyncio.QueueFull:
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._notify_queue.put((send, args)), wait)
+                    return True
+                except asyncio.TimeoutError:
+                    pass
+            self.logger.warning(f"Bildirim kuyruğu dolu, bildirim atlandı: {args}")
+            return False
+            
+    async def _notification_worker(self):
+        """Kuyruktaki Telegram bildirimlerini sırayla gönder"""
+        while True:
+            send, args = await self._notify_queue.get()
+            try:
+                await send(*args)
+            except Exception as e:
+                self.logger.error(f"Telegram bildirim hatası: {e}")
+            finally:
+                self._notify_queue.task_done()
+                
+    async def flush_notifications(self, timeout: float = 10):
+        """Kuyrukta bekleyen bildirimlerin gönderilmesini bekle ve worker'ı durdur (kapanışta)"""
+        if self._notify_worker is None or self._notify_worker.done():
+            return
+        try:
+            await asyncio.wait_for(self._notify_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Bildirim kuyruğu zaman aşımında boşaltılamadı")
+        self._notify_worker.cancel()
+        
+    def _analyze_stop_loss_reason(self, signal: TrackedSignal) -> str:
         """Stop Loss nedenini analiz et"""
         try:
-            # Basit neden analizi (geliştirilecek)
-            loss_percentage = signal.max_loss_percentage
-            
-            if loss_percentage > 5:
-                return "Güçlü tersine hareket"
-            elif loss_percentage > 3:
-                return "Trend değişimi"
-            elif loss_percentage > 1:
-                return "Düzeltme hareketi"
-            else:
-                return "Teknik seviye kırılması"
+            # Basit neden analizi (geliştirilecek) - if/elif zinciri yerine eşik tablosunda ikili arama
+            return STOP_LOSS_REASONS[bisect_left(STOP_LOSS_REASON_THRESHOLDS, signal.max_loss_percentage)]
                 
         except Exception as e:
             self.logger.error(f"SL neden analizi hatası: {e}")
@@ -265,17 +539,8 @@ class SignalTracker:
     async def _complete_signal(self, signal: TrackedSignal, completion_reason: str):
         """Sinyali tamamla"""
         try:
-            # Sinyal sonucunu hazırla
-            outcome = {
-                'signal_id': signal.signal_id,
-                'symbol': signal.symbol,
-                'exit_price': signal.current_price,
-                'exit_reason': completion_reason,
-                'hit_tp_level': max(signal.hit_tp_levels) if signal.hit_tp_levels else 0,
-                'max_drawdown': signal.max_loss_percentage,
-                'duration_minutes': int((signal.updated_at - signal.created_at).total_seconds() / 60),
-                'timestamp': signal.updated_at.isoformat()
-            }
+            # Sinyal süresi bir kez hesaplanır
+            duration_minutes = int((signal.updated_at - signal.created_at).total_seconds() / 60)
             
             # AI optimizer'a performans verisi gönder
             signal_dict = {
@@ -294,13 +559,13 @@ class SignalTracker:
             
             # Gerçek sonuç verisi
             result_data = {
-                'success': len(signal.hit_tp_levels) > 0,  # En az TP1 vurduysa başarılı
+                'success': signal.hit_tp_levels != 0,  # En az TP1 vurduysa başarılı
                 'profit_loss_percent': self._calculate_profit_loss(signal),
-                'hit_tp1': 1 in signal.hit_tp_levels,
-                'hit_tp2': 2 in signal.hit_tp_levels,
-                'hit_tp3': 3 in signal.hit_tp_levels,
+                'hit_tp1': signal.has_hit_tp(1),
+                'hit_tp2': signal.has_hit_tp(2),
+                'hit_tp3': signal.has_hit_tp(3),
                 'hit_sl': signal.status == SignalStatus.STOP_LOSS,
-                'duration_minutes': int((signal.updated_at - signal.created_at).total_seconds() / 60),
+                'duration_minutes': duration_minutes,
                 'market_condition': self._determine_market_condition(signal),
                 'stop_loss_reason': completion_reason if signal.status == SignalStatus.STOP_LOSS else None
             }
@@ -319,15 +584,17 @@ class SignalTracker:
                 self.logger.error(f"AI feedback hatası: {ai_error}")
             
             # Completed signals listesine ekle
-            self.completed_signals.append(signal)
+            self._add_completed_signal(signal)
             
             # Active signals'den çıkar
             if signal.signal_id in self.active_signals:
                 del self.active_signals[signal.signal_id]
+                self._count_signal(signal, -1)
+            self._by_status[signal.status].discard(signal.signal_id)
                 
-            # Dosyaları güncelle
-            self._save_active_signals()
-            self._save_signal_history()
+            # Dosyaları güncelle - yalnızca değişen kayıtlar günlüğe eklenir
+            self._append_active_wal(signal.signal_id, None)
+            self._append_history(signal)
             
             self.logger.info(f"Sinyal tamamlandı: {signal.symbol} - {completion_reason}")
             
@@ -337,24 +604,20 @@ class SignalTracker:
     async def _expire_signal(self, signal: TrackedSignal):
         """Süresi dolmuş sinyali sonlandır"""
         try:
-            signal.status = SignalStatus.EXPIRED
+            self._set_status(signal, SignalStatus.EXPIRED)
             await self._complete_signal(signal, "Süre doldu")
             
         except Exception as e:
             self.logger.error(f"Sinyal süre dolma hatası: {e}")
             
-    def _is_signal_expired(self, signal: TrackedSignal) -> bool:
+    def _is_signal_expired(self, signal: TrackedSignal, now: datetime) -> bool:
         """Sinyalin süresi dolmuş mu kontrol et"""
-        age_hours = (datetime.now() - signal.created_at).total_seconds() / 3600
-        return age_hours > self.max_signal_age_hours
+        return now - signal.created_at > self._max_signal_age
     
     def _calculate_profit_loss(self, signal: TrackedSignal) -> float:
         """Kar/zarar yüzdesini hesapla"""
         try:
-            if signal.signal_type == "LONG":
-                profit_loss = ((signal.current_price - signal.entry_price) / signal.entry_price) * 100
-            else:  # SHORT
-                profit_loss = ((signal.entry_price - signal.current_price) / signal.entry_price) * 100
+            profit_loss = ((signal.direction * (signal.current_price - signal.entry_price)) / signal.entry_price) * 100
             return round(profit_loss, 2)
         except:
             return 0.0
@@ -373,41 +636,22 @@ class SignalTracker:
             return "UNKNOWN"
         
     def get_active_signals_summary(self) -> Dict:
-        """Aktif sinyallerin özeti"""
+        """Aktif sinyallerin özeti (değişiklik anında tutulan sayaçlardan, tarama yok)"""
         try:
-            summary = {
+            performance = self._performance_counts
+            return {
                 'total_active': len(self.active_signals),
-                'by_status': {},
-                'by_symbol': {},
+                'by_status': {status.value: len(signal_ids) for status, signal_ids in self._by_status.items() if signal_ids},
+                'by_symbol': dict(self._symbol_counts),
                 'performance_summary': {
-                    'profitable_signals': 0,
-                    'losing_signals': 0,
-                    'tp1_hits': 0,
-                    'tp2_hits': 0,
-                    'tp3_hits': 0
+                    'profitable_signals': performance['profitable_signals'],
+                    'losing_signals': performance['losing_signals'],
+                    'tp1_hits': performance['tp1_hits'],
+                    'tp2_hits': performance['tp2_hits'],
+                    'tp3_hits': performance['tp3_hits']
                 }
             }
             
-            for signal in self.active_signals.values():
-                # Status'a göre gruppla
-                status_key = signal.status.value
-                summary['by_status'][status_key] = summary['by_status'].get(status_key, 0) + 1
-                
-                # Symbol'e göre gruppla
-                summary['by_symbol'][signal.symbol] = summary['by_symbol'].get(signal.symbol, 0) + 1
-                
-                # Performans hesapla
-                if signal.max_profit_percentage > 0:
-                    summary['performance_summary']['profitable_signals'] += 1
-                if signal.max_loss_percentage > 0:
-                    summary['performance_summary']['losing_signals'] += 1
-                    
-                # TP hits
-                for tp_level in signal.hit_tp_levels:
-                    summary['performance_summary'][f'tp{tp_level}_hits'] += 1
-                    
-            return summary
-            
         except Exception as e:
             self.logger.error(f"Özet hazırlama hatası: {e}")
             return {}
@@ -415,104 +659,217 @@ class SignalTracker:
     def _save_active_signals(self):
         """Aktif sinyalleri kaydet"""
         try:
-            signals_data = {}
-            for signal_id, signal in self.active_signals.items():
-                signal_dict = asdict(signal)
-                # Datetime objelerini string'e çevir
-                signal_dict['created_at'] = signal.created_at.isoformat()
-                signal_dict['updated_at'] = signal.updated_at.isoformat()
-                signal_dict['status'] = signal.status.value
-                signals_data[signal_id] = signal_dict
-                
-            with open(self.active_signals_file, 'w', encoding='utf-8') as f:
-                json.dump(signals_data, f, indent=2, ensure_ascii=False)
+            signals_data = {signal_id: signal.to_dict() for signal_id, signal in self.active_signals.items()}
+            
+            self._write_json_atomic(self.active_signals_file, signals_data)
+            # Anlık görüntü güncel: günlüğü boşalt (yarıda kesilirse tekrar oynatma idempotent)
+            open(self.active_signals_wal, 'w').close()
+            self._active_wal_appends = 0
+            self._last_active_save = time.monotonic()
                 
         except Exception as e:
             self.logger.error(f"Aktif sinyal kaydetme hatası: {e}")
             
+    def _add_completed_signal(self, signal: TrackedSignal):
+        """Tamamlanan sinyali tampona ekle; tampon doluysa düşecek en eski sinyali arşivle"""
+        if len(self.completed_signals) == self.completed_signals.maxlen:
+            self._archive_signal(self.completed_signals[0])
+        self.completed_signals.append(signal)
+    
+    def _archive_signal(self, signal: TrackedSignal):
+        """Tampondan düşen sinyali arşiv JSONL dosyasına ekle"""
+        try:
+            with open(self.signal_archive_file, 'ab') as f:
+                f.write(_json_dumps(signal.to_dict()) + b"\n")
+        except Exception as e:
+            self.logger.error(f"Sinyal arşivleme hatası: {e}")
+            
     def _save_signal_history(self):
-        """Sinyal geçmişini kaydet"""
+        """Sinyal geçmişini tampondaki son sinyallerle JSONL olarak baştan yaz (atomik)"""
         try:
-            history_data = []
-            for signal in self.completed_signals:
-                signal_dict = asdict(signal)
-                signal_dict['created_at'] = signal.created_at.isoformat()
-                signal_dict['updated_at'] = signal.updated_at.isoformat()
-                signal_dict['status'] = signal.status.value
-                history_data.append(signal_dict)
-                
-            with open(self.signal_history_file, 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, indent=2, ensure_ascii=False)
+            tmp_file = self.signal_history_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.writelines(_json_dumps(signal.to_dict()) + b"\n" for signal in self.completed_signals)
+            os.replace(tmp_file, self.signal_history_file)
+            self._history_file_records = len(self.completed_signals)
                 
         except Exception as e:
             self.logger.error(f"Sinyal geçmişi kaydetme hatası: {e}")
             
+    def _append_active_wal(self, signal_id: str, signal: Optional[TrackedSignal]):
+        """Aktif sinyal değişikliğini WAL'a ekle (signal None ise silme kaydı)"""
+        try:
+            if signal is None:
+                record = {'op': 'delete', 'id': signal_id}
+            else:
+                record = {'op': 'upsert', 'id': signal_id, 'data': signal.to_dict()}
+            with open(self.active_signals_wal, 'ab') as f:
+                f.write(_json_dumps(record) + b"\n")
+                
+            self._active_wal_appends += 1
+            if self._active_wal_appends >= self.wal_compact_every:
+                self._save_active_signals()
+                
+        except Exception as e:
+            self.logger.error(f"Aktif sinyal WAL yazma hatası: {e}")
+            
+    def _append_history(self, signal: TrackedSignal):
+        """Tamamlanan sinyali geçmiş JSONL dosyasının sonuna ekle (tamamlama başına O(1) yazım)"""
+        try:
+            with open(self.signal_history_file, 'ab') as f:
+                f.write(_json_dumps(signal.to_dict()) + b"\n")
+                
+            # Dosya tamponun iki katını aşınca yalnızca tampondaki sinyallerle yeniden yaz
+            # (baştaki satırlar tampondan düşerken zaten arşivlendi)
+            self._history_file_records += 1
+            if self._history_file_records > 2 * self.max_completed_signals:
+                self._save_signal_history()
+                
+        except Exception as e:
+            self.logger.error(f"Sinyal geçmişi yazma hatası: {e}")
+            
+    @staticmethod
+    def _write_json_atomic(path: str, data) -> None:
+        """Kompakt JSON'u geçici dosyaya yazıp os.replace ile atomik olarak yerine koy"""
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(data))
+        os.replace(tmp_file, path)
+            
     def load_signals(self):
-        """Kayıtlı sinyalleri yükle"""
+        """Kayıtlı sinyalleri yükle (anlık görüntü + WAL tekrar oynatma)"""
         try:
             # Aktif sinyalleri yükle
             try:
-                with open(self.active_signals_file, 'r', encoding='utf-8') as f:
-                    signals_data = json.load(f)
+                with open(self.active_signals_file, 'rb') as f:
+                    signals_data = _json_loads(f.read())
                     
                 for signal_id, signal_dict in signals_data.items():
-                    signal_dict['created_at'] = datetime.fromisoformat(signal_dict['created_at'])
-                    signal_dict['updated_at'] = datetime.fromisoformat(signal_dict['updated_at'])
-                    signal_dict['status'] = SignalStatus(signal_dict['status'])
+                    self.active_signals[signal_id] = self._signal_from_dict(signal_dict)
                     
-                    signal = TrackedSignal(**signal_dict)
-                    self.active_signals[signal_id] = signal
-                    
-                self.logger.info(f"{len(self.active_signals)} aktif sinyal yüklendi")
-                
             except FileNotFoundError:
                 self.logger.info("Aktif sinyal dosyası bulunamadı")
                 
-            # Sinyal geçmişini yükle
+            # Anlık görüntüden sonraki değişiklikleri sırayla uygula
+            active_records = self._read_jsonl(self.active_signals_wal)
+            for record in active_records:
+                if record['op'] == 'delete':
+                    self.active_signals.pop(record['id'], None)
+                else:
+                    self.active_signals[record['id']] = self._signal_from_dict(record['data'])
+            self._active_wal_appends = len(active_records)
+            self._rebuild_status_index()
+            
+            self.logger.info(f"{len(self.active_signals)} aktif sinyal yüklendi")
+                
+            # Sinyal geçmişini akış halinde yükle - yalnızca tampona sığacak son N satır ayrıştırılır,
+            # baştaki satırlar tampondan taşmış ve zaten arşivlenmiş kayıtlardır
+            history_found = False
             try:
-                with open(self.signal_history_file, 'r', encoding='utf-8') as f:
-                    history_data = json.load(f)
-                    
-                for signal_dict in history_data:
-                    signal_dict['created_at'] = datetime.fromisoformat(signal_dict['created_at'])
-                    signal_dict['updated_at'] = datetime.fromisoformat(signal_dict['updated_at'])
-                    signal_dict['status'] = SignalStatus(signal_dict['status'])
-                    
-                    signal = TrackedSignal(**signal_dict)
-                    self.completed_signals.append(signal)
-                    
-                self.logger.info(f"{len(self.completed_signals)} tamamlanmış sinyal yüklendi")
+                with open(self.signal_history_file, 'rb') as f:
+                    tail_lines = deque(maxlen=self.max_completed_signals)
+                    line_count = 0
+                    for line in f:
+                        tail_lines.append(line)
+                        line_count += 1
+                        
+                for signal_dict in self._parse_jsonl_lines(tail_lines, self.signal_history_file):
+                    self.completed_signals.append(self._signal_from_dict(signal_dict))
+                self._history_file_records = line_count
+                history_found = True
                 
             except FileNotFoundError:
-                self.logger.info("Sinyal geçmişi dosyası bulunamadı")
+                pass
+            
+            if not history_found:
+                # Eski JSON dizisi formatından tek seferlik geçiş
+                try:
+                    with open(self.legacy_signal_history_file, 'rb') as f:
+                        history_data = _json_loads(f.read())
+                        
+                    for signal_dict in history_data:
+                        self._add_completed_signal(self._signal_from_dict(signal_dict))
+                    self._save_signal_history()
+                    
+                except FileNotFoundError:
+                    self.logger.info("Sinyal geçmişi dosyası bulunamadı")
+            
+            self.logger.info(f"{len(self.completed_signals)} tamamlanmış sinyal yüklendi")
                 
         except Exception as e:
             self.logger.error(f"Sinyal yükleme hatası: {e}")
             
+    def _read_jsonl(self, path: str) -> List[Dict]:
+        """JSONL (WAL / geçmiş) satırlarını oku; yarım kalmış (bozuk) satırlar atlanır"""
+        try:
+            with open(path, 'rb') as f:
+                return list(self._parse_jsonl_lines(f, path))
+        except FileNotFoundError:
+            return []
+            
+    def _parse_jsonl_lines(self, lines, path: str):
+        """JSONL satırlarını tek tek ayrıştır (generator); boş ve bozuk satırlar atlanır"""
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield _json_loads(line)
+            except ValueError:
+                self.logger.warning(f"Bozuk JSONL satırı atlandı: {path}")
+        
+    @staticmethod
+    def _signal_from_dict(signal_dict: Dict) -> TrackedSignal:
+        """Kayıtlı dict'ten TrackedSignal oluştur"""
+        signal_dict['created_at'] = datetime.fromisoformat(signal_dict['created_at'])
+        signal_dict['updated_at'] = datetime.fromisoformat(signal_dict['updated_at'])
+        signal_dict['status'] = SignalStatus(signal_dict['status'])
+        hit_tp_levels = 0
+        for tp_level in signal_dict.get('hit_tp_levels', []):
+            hit_tp_levels |= 1 << tp_level
+        signal_dict['hit_tp_levels'] = hit_tp_levels
+        return TrackedSignal(**signal_dict)
+            
     async def start_tracking(self):
-        """Sinyal takibini başlat"""
+        """Sinyal takibini başlat (sabit aralıklı, monotonic saat ile)"""
         self.logger.info("Sinyal takibi başlatıldı")
         
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         while True:
             try:
                 await self.update_signal_prices()
-                await asyncio.sleep(self.price_check_interval)
+                # Uyku süresi tick süresini hesaba katar; aralık kaymaz
+                deadline = self.next_tick_deadline(deadline, loop.time())
+                await asyncio.sleep(deadline - loop.time())
                 
             except Exception as e:
                 self.logger.error(f"Tracking loop hatası: {e}")
                 await asyncio.sleep(60)  # Hata durumunda 1 dakika bekle
+                deadline = loop.time()
+                
+    def next_tick_deadline(self, deadline: float, now: float) -> float:
+        """Bir sonraki tick zamanı (monotonic); yavaş tick'te kaçan aralıklar birikmeden atlanır"""
+        deadline += self.price_check_interval
+        if deadline <= now:
+            deadline += ((now - deadline) // self.price_check_interval + 1) * self.price_check_interval
+        return deadline
     
     # 🚀 YENİ: GELİŞMİŞ AI OPTİMİZASYON İÇİN FONKSİYONLAR
     def get_failed_signals_last_24h(self) -> List[Dict]:
         """Son 24 saatte başarısız olan sinyalleri döndür"""
         try:
             failed_signals = []
-            cutoff_time = datetime.now() - timedelta(hours=24)
+            now = datetime.now()
+            cutoff_time = now - timedelta(hours=24)
             
             # Completed signals'dan başarısızları al
             for signal in self.completed_signals:
                 if signal.created_at >= cutoff_time:
                     if signal.status in [SignalStatus.STOP_LOSS, SignalStatus.EXPIRED]:
+                        # Göstergeler bir kez çıkarılır; hem token analizi hem kayıt aynı görünümü kullanır
+                        view = self._indicator_view(signal)
+                        failure_tokens = self._analyze_failure_tokens(signal, view)
+                        
                         # Başarısız sinyal verisi hazırla
                         failed_data = {
                             'signal_id': signal.signal_id,
@@ -527,23 +884,23 @@ class SignalTracker:
                             'max_profit_percentage': signal.max_profit_percentage,
                             'max_loss_percentage': signal.max_loss_percentage,
                             'duration_hours': (signal.updated_at - signal.created_at).total_seconds() / 3600,
-                            'failure_reason': self._analyze_failure_reason(signal),
+                            'failure_reason': "_".join(failure_tokens),
+                            'failure_tokens': failure_tokens,
                             'analysis_data': signal.analysis_data,
                             'created_at': signal.created_at.isoformat(),
                             'status': signal.status.value
                         }
                         
                         # M5 confirmation skorları ekle (eğer varsa)
-                        if isinstance(signal.analysis_data, dict):
-                            failed_data['m5_confirmation_score'] = signal.analysis_data.get('m5_confirmation_score', 0)
-                            failed_data['adx_value'] = signal.analysis_data.get('adx_value', 0)
-                            failed_data['volume_score'] = signal.analysis_data.get('volume_score', 0)
+                        if view is not None:
+                            for key in FAILURE_INDICATOR_KEYS:
+                                failed_data[key] = view.get(key, 0)
                         
                         failed_signals.append(failed_data)
             
             # Active signals'dan çok eski olanları da ekle (24 saatten eski)
             for signal in self.active_signals.values():
-                signal_age = datetime.now() - signal.created_at
+                signal_age = now - signal.created_at
                 if signal_age.total_seconds() > (20 * 3600):  # 20 saatten eski
                     failed_data = {
                         'signal_id': signal.signal_id,
@@ -559,6 +916,7 @@ class SignalTracker:
                         'max_loss_percentage': signal.max_loss_percentage,
                         'duration_hours': signal_age.total_seconds() / 3600,
                         'failure_reason': 'signal_too_old',
+                        'failure_tokens': ['signal_too_old'],
                         'analysis_data': signal.analysis_data,
                         'created_at': signal.created_at.isoformat(),
                         'status': 'active_too_long'
@@ -574,13 +932,26 @@ class SignalTracker:
     
     def _analyze_failure_reason(self, signal: TrackedSignal) -> str:
         """Sinyalin başarısızlık nedenini analiz et"""
+        return "_".join(self._analyze_failure_tokens(signal))
+    
+    def _indicator_view(self, signal: TrackedSignal) -> Optional[Dict]:
+        """analysis_data içinden başarısızlık göstergelerini tek geçişte çıkar (dict değilse None)"""
+        data = signal.analysis_data
+        if not isinstance(data, dict):
+            return None
+        return {key: data[key] for key in FAILURE_INDICATOR_KEYS if key in data}
+    
+    def _analyze_failure_tokens(self, signal: TrackedSignal, view: Optional[Dict] = None) -> List[str]:
+        """Sinyalin başarısızlık nedenlerini ayrı token listesi olarak döndür"""
         try:
+            if view is None:
+                view = self._indicator_view(signal)
             reasons = []
+            duration_hours = (signal.updated_at - signal.created_at).total_seconds() / 3600
             
             # Stop loss'a takıldı mı?
             if signal.status == SignalStatus.STOP_LOSS:
                 # SL'a ne kadar hızlı takıldı?
-                duration_hours = (signal.updated_at - signal.created_at).total_seconds() / 3600
                 if duration_hours < 1:
                     reasons.append("quick_stop_loss")
                 elif duration_hours < 4:
@@ -589,10 +960,7 @@ class SignalTracker:
                     reasons.append("late_stop_loss")
                 
                 # SL çok dar mıydı?
-                if signal.signal_type == "LONG":
-                    sl_distance = ((signal.entry_price - signal.stop_loss) / signal.entry_price) * 100
-                else:
-                    sl_distance = ((signal.stop_loss - signal.entry_price) / signal.entry_price) * 100
+                sl_distance = ((signal.direction * (signal.entry_price - signal.stop_loss)) / signal.entry_price) * 100
                 
                 if sl_distance < 1.0:
                     reasons.append("sl_too_tight")
@@ -602,12 +970,8 @@ class SignalTracker:
             # Süresi doldu mu?
             elif signal.status == SignalStatus.EXPIRED:
                 # TP'lere yaklaştı mı hiç?
-                if signal.signal_type == "LONG":
-                    tp1_distance = ((signal.tp1 - signal.entry_price) / signal.entry_price) * 100
-                    max_reached = signal.max_profit_percentage
-                else:
-                    tp1_distance = ((signal.entry_price - signal.tp1) / signal.entry_price) * 100
-                    max_reached = signal.max_profit_percentage
+                tp1_distance = ((signal.direction * (signal.tp1 - signal.entry_price)) / signal.entry_price) * 100
+                max_reached = signal.max_profit_percentage
                 
                 if max_reached < (tp1_distance * 0.3):
                     reasons.append("tp_missed")
@@ -617,31 +981,28 @@ class SignalTracker:
                     reasons.append("almost_hit_tp")
             
             # M5 confirmation zayıf mıydı?
-            if isinstance(signal.analysis_data, dict):
-                m5_score = signal.analysis_data.get('m5_confirmation_score', 100)
-                if m5_score < 60:
+            if view is not None:
+                get = view.get
+                if get('m5_confirmation_score', 100) < 60:
                     reasons.append("weak_m5_confirmation")
                 
                 # ADX zayıf mıydı?
-                adx_value = signal.analysis_data.get('adx_value', 30)
-                if adx_value < 25:
+                if get('adx_value', 30) < 25:
                     reasons.append("weak_adx")
                 
                 # Volume düşük müydü?
-                volume_score = signal.analysis_data.get('volume_score', 100)
-                if volume_score < 50:
+                if get('volume_score', 100) < 50:
                     reasons.append("low_volume")
             
             # Genel nedenler
-            duration_hours = (signal.updated_at - signal.created_at).total_seconds() / 3600
             if duration_hours > 20:
                 reasons.append("signal_too_old")
             
-            return "_".join(reasons) if reasons else "unknown_failure"
+            return reasons if reasons else ["unknown_failure"]
             
         except Exception as e:
             self.logger.error(f"Başarısızlık nedeni analizi hatası: {e}")
-            return "analysis_error"
+            return ["analysis_error"]
     
     def get_signal_performance_stats(self, days: int = 7) -> Dict:
         """Sinyal performans istatistikleri"""
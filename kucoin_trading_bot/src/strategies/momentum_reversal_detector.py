@@ -3,6 +3,7 @@ Momentum Failure to Return (MOM-FTR) Strategy
 3+ ardışık momentum + tersleme pattern tespiti
 """
 
+import heapq
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
@@ -43,18 +44,16 @@ class MomentumReversalDetector:
             
             # En son ve en güçlü sinyalleri al
             if signals['bullish_reversal']:
-                signals['bullish_reversal'] = sorted(
-                    signals['bullish_reversal'], 
-                    key=lambda x: (x['timestamp'], x['strength']), 
-                    reverse=True
-                )[:3]
+                signals['bullish_reversal'] = heapq.nlargest(
+                    3, signals['bullish_reversal'],
+                    key=lambda x: (x['timestamp'], x['strength'])
+                )
             
             if signals['bearish_reversal']:
-                signals['bearish_reversal'] = sorted(
-                    signals['bearish_reversal'], 
-                    key=lambda x: (x['timestamp'], x['strength']), 
-                    reverse=True
-                )[:3]
+                signals['bearish_reversal'] = heapq.nlargest(
+                    3, signals['bearish_reversal'],
+                    key=lambda x: (x['timestamp'], x['strength'])
+                )
             
             return signals
             